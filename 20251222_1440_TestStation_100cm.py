@@ -82,6 +82,34 @@ def center_4_ROI(x_30,Dx,y_center_ave,dx,up_dy,down_dy):
         ROIpoints.append(position)
     return    ROIpoints 
 
+########   20261018新增 向量化模式 (第二個參數 --vectorized), 輸出與逐點迴圈完全相同   ########
+def ROI_Rgray_vectorized(ROI_image):
+    # 同逐點迴圈: uint8/uint8 得 float64, r=0 時為 inf/nan (比較為 False, 該點不取)
+    B,G,R=ROI_image[:,:,0],ROI_image[:,:,1],ROI_image[:,:,2]
+    with np.errstate(divide='ignore',invalid='ignore'):
+        mask=(G/R < 0.75) & (B/R < 0.75)
+    ROI_image_Rgray=np.zeros([ROI_image.shape[0],ROI_image.shape[1],1],dtype=np.uint8)
+    ROI_image_Rgray[:,:,0]=np.where(mask,R,0)
+    return ROI_image_Rgray
+
+def slit_RGB_vectorized(image_slide_roi,Wx,d_x):
+    h,w=image_slide_roi.shape[:2]
+    if w < Wx:                                      ##### 邊界情況 (含原本的 IndexError) 交給原迴圈
+        return slit_RGB(image_slide_roi,Wx,d_x)
+    # 整數加總後 /Wx, 存入 uint8 時截斷小數 (同 itemset)
+    ave_L=image_slide_roi[:,:Wx].sum(axis=1,dtype=np.int64)/Wx
+    ave_R=image_slide_roi[:,w-Wx:].sum(axis=1,dtype=np.int64)/Wx
+    image_slide_L=np.repeat(ave_L.astype(np.uint8)[:,np.newaxis,:],d_x,axis=1)
+    image_slide_R=np.repeat(ave_R.astype(np.uint8)[:,np.newaxis,:],d_x,axis=1)
+    return image_slide_L,image_slide_R
+
+def ROI_point_average(gray,image,x,y):
+    # 10x10 鄰域平均 (x-5~x+4, y-5~y+4); 負索引/越界與逐點索引相同, 結果為 np.float64 (除以 0 時得 inf/nan 而非例外)
+    n=100
+    idx=np.ix_(np.arange(y-5,y+5),np.arange(x-5,x+5))
+    sum_BGR=image[idx].sum(axis=(0,1),dtype=np.int64)
+    return gray[idx].sum(dtype=np.int64)/n,sum_BGR[2]/n,sum_BGR[1]/n,sum_BGR[0]/n
+
 def Find_Center_ROI(image,ROIpoints,limit_w1,limit_w2,limit_H1,limit_H2):  
     # thd=140 
     thd=120 
@@ -89,18 +117,21 @@ def Find_Center_ROI(image,ROIpoints,limit_w1,limit_w2,limit_H1,limit_H2):
         ROI_image=image[ROIpoints[i][2]:ROIpoints[i][3],ROIpoints[i][0]:ROIpoints[i][1]]
         h,w=ROI_image.shape[:2]
         show(ROI_image)
-        ROI_image_Rgray=np.zeros([h,w,1],dtype=np.uint8)
-        for j in range(w):
-            for k in range(h):
-                R_b,R_g,R_r=(ROI_image[k,j])
-                L_b,L_g,L_r=(ROI_image[k,j])
-                rate_gr_R=R_g/R_r
-                rate_br_R=R_b/R_r
-                rate_gr_L=L_g/L_r
-                rate_br_L=L_b/L_r
-                if rate_gr_R < 0.75 and rate_gr_L < 0.75 and rate_br_R < 0.75 and rate_br_L < 0.75:  #######09/02改0.75 排除灰/黑/藍/綠
-                    r = ROI_image.item(k,j,2)
-                    ROI_image_Rgray.itemset((k,j,0),r)
+        if VECTORIZED:
+            ROI_image_Rgray=ROI_Rgray_vectorized(ROI_image)
+        else:
+            ROI_image_Rgray=np.zeros([h,w,1],dtype=np.uint8)
+            for j in range(w):
+                for k in range(h):
+                    R_b,R_g,R_r=(ROI_image[k,j])
+                    L_b,L_g,L_r=(ROI_image[k,j])
+                    rate_gr_R=R_g/R_r
+                    rate_br_R=R_b/R_r
+                    rate_gr_L=L_g/L_r
+                    rate_br_L=L_b/L_r
+                    if rate_gr_R < 0.75 and rate_gr_L < 0.75 and rate_br_R < 0.75 and rate_br_L < 0.75:  #######09/02改0.75 排除灰/黑/藍/綠
+                        r = ROI_image.item(k,j,2)
+                        ROI_image_Rgray.itemset((k,j,0),r)
         # show_g(ROI_image_Rgray)
         BLACK_line = np.full((h, 3, 1), 0, dtype=np.uint8)  ####### 在左邊添加R線
         ROI_image_Rgray= np.hstack((BLACK_line, ROI_image_Rgray))
@@ -418,6 +449,7 @@ def Pixel_Shift_analysis(ROI_gray, diff_thd, center_line):
 
 # 主程式開始
 root=str(sys.argv[1])
+VECTORIZED='--vectorized' in sys.argv[2:]     #####20261018新增 向量化模式, 輸出與原迴圈相同
 # root=str('./20251222_we255100074/')        ######需修改
 type1='.bmp'
 type2='.png'
@@ -486,7 +518,10 @@ for i in range(len(file_list)):
     d_x=Wx                                #####計算的條寬,可為1   
     hlimit= 750
     print('2_stage: start to Find 3/4 Color zone  slide_R: (R parameter is KEY)')    
-    image_slide_L,image_slide_R=slit_RGB(image_slide_roi,Wx,d_x)
+    if VECTORIZED:
+        image_slide_L,image_slide_R=slit_RGB_vectorized(image_slide_roi,Wx,d_x)
+    else:
+        image_slide_L,image_slide_R=slit_RGB(image_slide_roi,Wx,d_x)
     L_R_list,R_R_list=find_RGB_List(image_slide_L,image_slide_R)
     L_R_Py,R_R_Py,L_R_H,R_R_H,area_0,area_1,area_2=find_RGB_PyH(L_R_list,R_R_list,hlimit)          #######L_R_Py 左邊R的位置,R_R_Py 右邊R的位置,L_R_H左邊R的寬度,R_R_H左邊R的寬度
 
@@ -623,16 +658,19 @@ for i in range(len(file_list)):
         for i in range(len(center)):
             x=int(center[i][1])
             y=int(center[i][0])
-            n,sum,sum_R,sum_G,sum_B,ave_r,ave_g,ave_b=0,0,0,0,0,0,0,0
-            for j in range(x-5,x+5):
-                for k in range(y-5,y+5):
-                    n+=1
-                    sum += gray[k,j]
-                    sum_R += image[k,j,2]
-                    sum_G += image[k,j,1]
-                    sum_B += image[k,j,0]
-                    # image[k,j]=0
-            ave,ave_r,ave_g,ave_b=sum/n,sum_R/n,sum_G/n,sum_B/n
+            if VECTORIZED:
+                ave,ave_r,ave_g,ave_b=ROI_point_average(gray,image,x,y)
+            else:
+                n,sum,sum_R,sum_G,sum_B,ave_r,ave_g,ave_b=0,0,0,0,0,0,0,0
+                for j in range(x-5,x+5):
+                    for k in range(y-5,y+5):
+                        n+=1
+                        sum += gray[k,j]
+                        sum_R += image[k,j,2]
+                        sum_G += image[k,j,1]
+                        sum_B += image[k,j,0]
+                        # image[k,j]=0
+                ave,ave_r,ave_g,ave_b=sum/n,sum_R/n,sum_G/n,sum_B/n
             ave_list.append(ave)
             ave_R.append(ave_r)
             ave_G.append(ave_g)
@@ -0,0 +1,211 @@
+"""
+End-to-end engine benchmark over the sample corpus.
+
+    python -m benchmark                       # IMAGE/ + IMAGE/ZIP/*, appends to benchmark_history.json
+    python -m benchmark IMAGE --repeat 3 --threshold 0.15
+
+Per image the stages are timed separately:
+  decode               decode_image (seam-strip decode, the default analysis path)
+  prepare              analyze_image_prepare on the decoded frame (stages 1-2)
+  process_step         stages 3-4 for every target (includes analyze_discontinuity)
+  analyze_discontinuity  the stage-4 part of process_step
+  decode_full          full-frame decode for the distortion scan (--no-dist skips)
+  check_distortion     global distortion scan
+The run (per-stage totals, ms/image p50/p95, images/s, peak RSS) is appended to
+the JSON history and compared with the previous run (or --baseline): a stage
+whose median ms/image grew by more than --threshold is a regression (exit 1).
+"""
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import time
+import numpy as np
+from splicing_logic import SplicingProcessor, ENGINE_VERSION
+from splicing_cli import iter_inputs
+
+STAGES = ("decode", "prepare", "process_step", "analyze_discontinuity", "decode_full", "check_distortion")
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None when unavailable)."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    except ImportError:
+        pass
+    try:
+        # Windows: PROCESS_MEMORY_COUNTERS.PeakWorkingSetSize
+        import ctypes
+        from ctypes import wintypes
+        class PMC(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+        pmc = PMC()
+        pmc.cb = ctypes.sizeof(PMC)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(pmc), pmc.cb):
+            return round(pmc.PeakWorkingSetSize / (1024 * 1024), 1)
+    except Exception:
+        pass
+    return None
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+def default_inputs():
+    base = os.path.join(os.path.dirname(os.path.abspath(__file__)), "IMAGE")
+    return [base] + sorted(glob.glob(os.path.join(base, "ZIP", "*.zip")) + glob.glob(os.path.join(base, "ZIP", "*.7z")))
+
+def bench_image(processor, path, data, check_distortion, times):
+    """Run every stage on one image, appending seconds per stage to times[stage]."""
+    disc_time = [0.0]
+    analyze_discontinuity = processor.analyze_discontinuity
+    def timed_discontinuity(*args):
+        t = time.perf_counter()
+        try: return analyze_discontinuity(*args)
+        finally: disc_time[0] += time.perf_counter() - t
+
+    t0 = time.perf_counter()
+    decoded = processor.decode_image(path, strip_only=True, data=data)
+    t1 = time.perf_counter()
+    result = processor.analyze_image_prepare(path, strip_only=True, data=data, decoded=decoded)
+    t2 = time.perf_counter()
+    times['decode'].append(t1 - t0)
+    times['prepare'].append(t2 - t1)
+    if not result or not result[1]:
+        return False
+
+    image, steps = result
+    processor.analyze_discontinuity = timed_discontinuity
+    try:
+        t0 = time.perf_counter()
+        for step in steps:
+            processor.process_step(image, step)
+        times['process_step'].append(time.perf_counter() - t0)
+        times['analyze_discontinuity'].append(disc_time[0])
+    finally:
+        del processor.analyze_discontinuity # Back to the class method
+
+    if check_distortion:
+        t0 = time.perf_counter()
+        full = processor.decode_image(path, strip_only=False, data=data)
+        t1 = time.perf_counter()
+        if full:
+            processor.check_distortion(full[0])
+            times['check_distortion'].append(time.perf_counter() - t1)
+        times['decode_full'].append(t1 - t0)
+    return True
+
+def summarize(times, n_images, wall):
+    stages = {}
+    for stage in STAGES:
+        vals = np.array(times.get(stage, [])) * 1000.0
+        if not len(vals): continue
+        stages[stage] = {'total_s': round(vals.sum() / 1000.0, 3), 'calls': int(len(vals)),
+                         'mean_ms': round(float(vals.mean()), 2), 'p50_ms': round(float(np.percentile(vals, 50)), 2),
+                         'p95_ms': round(float(np.percentile(vals, 95)), 2)}
+    return {'images': n_images, 'wall_s': round(wall, 3),
+            'images_per_s': round(n_images / wall, 3) if wall > 0 else None,
+            'peak_rss_mb': peak_rss_mb(), 'stages': stages}
+
+def run_benchmark(inputs, repeat=1, check_distortion=True, keyword="", progress=None):
+    processor = SplicingProcessor()
+    items = list(iter_inputs(inputs, keyword))
+    times = {stage: [] for stage in STAGES}
+    n_images = failed = 0
+    t_start = time.perf_counter()
+    for r in range(max(1, repeat)):
+        for k, (path, _, data) in enumerate(items):
+            if not bench_image(processor, path, data, check_distortion, times):
+                failed += 1
+            n_images += 1
+            if progress: progress(r * len(items) + k + 1, len(items) * max(1, repeat))
+    result = summarize(times, n_images, time.perf_counter() - t_start)
+    result['unanalysable'] = failed
+    return result
+
+def compare(run, baseline, threshold):
+    """[(stage, base_p50_ms, p50_ms, ratio)] for stages slower than baseline by more than threshold."""
+    regressions = []
+    for stage, cur in run['stages'].items():
+        base = baseline.get('stages', {}).get(stage)
+        if not base or base['p50_ms'] <= 0: continue
+        ratio = cur['p50_ms'] / base['p50_ms']
+        if ratio > 1.0 + threshold:
+            regressions.append((stage, base['p50_ms'], cur['p50_ms'], ratio))
+    return regressions
+
+def load_history(path):
+    if not os.path.exists(path): return []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m benchmark", description="Per-stage engine benchmark with a JSON history.")
+    ap.add_argument("inputs", nargs="*", help="image files, folders, .zip or .7z archives (default IMAGE/ and IMAGE/ZIP/*)")
+    ap.add_argument("--repeat", type=int, default=1, help="passes over the corpus")
+    ap.add_argument("--no-dist", action="store_true", help="skip the full decode + distortion scan")
+    ap.add_argument("--keyword", default="")
+    ap.add_argument("--history", default="benchmark_history.json", help="JSON history file (appended)")
+    ap.add_argument("--baseline", help="compare with this history entry: index (e.g. -2) or commit; default the previous run")
+    ap.add_argument("--threshold", type=float, default=0.10, help="regression when p50 ms/image grows more than this fraction")
+    ap.add_argument("--label", default="", help="free text stored with the run")
+    ap.add_argument("--no-save", action="store_true", help="do not append the run to the history")
+    args = ap.parse_args(argv)
+
+    run = run_benchmark(args.inputs or default_inputs(), args.repeat, not args.no_dist, args.keyword,
+                        progress=lambda k, n: print(f"\r{k}/{n}", end="", file=sys.stderr))
+    run.update(time=time.strftime("%Y-%m-%d %H:%M:%S"), commit=git_commit(), engine=ENGINE_VERSION,
+               label=args.label, python=sys.version.split()[0], cpus=os.cpu_count())
+    print(file=sys.stderr)
+
+    print(f"{run['images']} images in {run['wall_s']:.2f}s -> {run['images_per_s']} images/s, peak RSS {run['peak_rss_mb']} MB")
+    print(f"{'stage':<22}{'total s':>9}{'calls':>7}{'mean ms':>10}{'p50 ms':>9}{'p95 ms':>9}")
+    for stage, s in run['stages'].items():
+        print(f"{stage:<22}{s['total_s']:>9.3f}{s['calls']:>7}{s['mean_ms']:>10.2f}{s['p50_ms']:>9.2f}{s['p95_ms']:>9.2f}")
+
+    history = load_history(args.history)
+    baseline = None
+    if args.baseline is not None and history:
+        try:
+            baseline = history[int(args.baseline)]
+        except (ValueError, IndexError):
+            matches = [h for h in history if (h.get('commit') or "").startswith(args.baseline)]
+            baseline = matches[-1] if matches else None
+        if baseline is None:
+            print(f"[WARN] baseline {args.baseline} not found in {args.history}", file=sys.stderr)
+    elif history:
+        baseline = history[-1]
+
+    code = 0
+    if baseline:
+        regressions = compare(run, baseline, args.threshold)
+        print(f"\nvs {baseline.get('commit') or '?'} ({baseline.get('time')}), threshold +{args.threshold * 100:.0f}%:")
+        for stage, base_ms, cur_ms, ratio in regressions:
+            print(f"  REGRESSION {stage}: p50 {base_ms:.2f} -> {cur_ms:.2f} ms (x{ratio:.2f})")
+        if not regressions:
+            print("  no regression")
+        code = 1 if regressions else 0
+
+    if not args.no_save:
+        history.append(run)
+        with open(args.history, 'w', encoding='utf-8') as f:
+            json.dump(history, f, ensure_ascii=False, indent=1)
+    return code
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -29,8 +29,6 @@ echo.
 echo [2/3] Building Package...
 pyinstaller %BUILD_MODE% --noconsole --clean ^
             --name "!DIST_NAME!" ^
-            --hidden-import scipy.signal ^
-            --collect-submodules scipy ^
             --collect-all ttkbootstrap ^
             --collect-all cv2 ^
             --collect-all PIL ^
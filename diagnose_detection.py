@@ -1,7 +1,7 @@
 import cv2
 import numpy as np
 import os
-from splicing_logic import SplicingProcessor
+from splicing_logic import SplicingProcessor, red_ratio_mask
 
 def imread_unicode(path):
     try:
@@ -39,9 +39,7 @@ def diagnose(path):
         rh, rw = ROI_image.shape[:2]
         # Mimic Find_Center_ROI color filtering
         b, g, r = cv2.split(ROI_image)
-        r_safe = r.astype(float)
-        r_safe[r_safe == 0] = 1.0 
-        mask = (g / r_safe < 0.75) & (b / r_safe < 0.75)
+        mask = red_ratio_mask(b, g, r)
         
         Rgray = np.zeros((rh, rw), dtype=np.uint8)
         Rgray[mask] = r[mask]
@@ -76,50 +74,27 @@ def diagnose(path):
     image_slide_roi = image[:, max(0, PX-delt_x):min(w, PX+delt_x)]
     Wx = delt_x - dshift
     
-    def get_slides(roi, wx):
-        h_roi, w_roi = roi.shape[:2]
-        ave_L = np.zeros((h_roi, 3), dtype=np.float64)
-        ave_R = np.zeros((h_roi, 3), dtype=np.float64)
-        for j in range(h_roi):
-            # Sum using slicing for speed
-            row_l = roi[j, :wx]
-            row_r = roi[j, -wx:]
-            ave_L[j] = np.mean(row_l, axis=0)
-            ave_R[j] = np.mean(row_r, axis=0)
-        return ave_L, ave_R
-
-    ave_L, ave_R = get_slides(image_slide_roi, Wx)
-    print(f"Ave slides computed. Height: {len(ave_L)}")
+    sum_L, sum_R, n = proc.get_slides(image_slide_roi, Wx)
+    print(f"Slide sums computed. Height: {len(sum_L)}")
     
-    def find_red_indices_diag(ave_col, name):
-        indices = []
+    def find_red_indices_diag(sum_col, name):
         thd = 120
-        count_r_zero = 0
-        count_color_fail = 0
-        count_thd_fail = 0
-        count_y_fail = 0
-        
-        for j in range(len(ave_col)):
-            b, g, r = ave_col[j]
-            if r == 0: 
-                count_r_zero += 1
-                continue
-            if not ((g/r < 0.75) and (b/r < 0.70)):
-                count_color_fail += 1
-                continue
-            if r <= thd:
-                count_thd_fail += 1
-                continue
-            if not (400 < j < 2650):
-                count_y_fail += 1
-                continue
-            indices.append(j)
+        r = sum_col[:, 2]
+        rows = np.arange(len(sum_col))
+        nonzero = r > 0
+        color = red_ratio_mask(sum_col[:, 0], sum_col[:, 1], r, br=(7, 10), n=n)
+        bright = color & (r > thd * n)
+        indices = np.flatnonzero(bright & (rows > 400) & (rows < 2650)).tolist()
+        count_r_zero = int((~nonzero).sum())
+        count_color_fail = int((nonzero & ~color).sum())
+        count_thd_fail = int((color & ~bright).sum())
+        count_y_fail = int(bright.sum()) - len(indices)
             
         print(f"  {name}: Found {len(indices)} red pixels. Failures: R=0:{count_r_zero}, Color:{count_color_fail}, Thd:{count_thd_fail}, Y-range:{count_y_fail}")
         return indices
 
-    L_R_list = find_red_indices_diag(ave_L, "Left Slide")
-    R_R_list = find_red_indices_diag(ave_R, "Right Slide")
+    L_R_list = find_red_indices_diag(sum_L, "Left Slide")
+    R_R_list = find_red_indices_diag(sum_R, "Right Slide")
     
     if not L_R_list or not R_R_list:
         print("FAILED: No red pixels found in one or both slides in Stage 2")
@@ -0,0 +1,37 @@
+import os
+import sys
+import time
+from splicing_logic import SplicingProcessor
+
+def parity_report(folder):
+    """Compare the contour and connected-component distortion engines on every image in folder."""
+    files = sorted(f for f in os.listdir(folder) if f.lower().endswith(('.jpg', '.jpeg', '.png', '.bmp')))
+    print(f"Distortion engine parity on {len(files)} files in {folder}")
+    print(f"{'File':<32} {'contour ecc/cnt/s':>22} {'components ecc/cnt/s':>24}  verdict")
+    
+    proc = SplicingProcessor()
+    agree = 0
+    for f in files:
+        decoded = proc.decode_image(os.path.join(folder, f))
+        if decoded is None:
+            print(f"{f:<32} (could not be loaded)")
+            continue
+        image = decoded[0]
+        
+        row = []
+        for engine in ("contour", "components"):
+            proc.dist_engine = engine
+            t0 = time.perf_counter()
+            is_dist, ecc, cnt, _ = proc.check_distortion(image)
+            row.append((is_dist, ecc, cnt, time.perf_counter() - t0))
+        
+        (d1, e1, c1, t1), (d2, e2, c2, t2) = row
+        same = d1 == d2
+        agree += same
+        verdict = "SAME" if same else "DIFF"
+        print(f"{f:<32} {e1:>9.2f} {c1:>7} {t1:>5.2f} {e2:>11.2f} {c2:>7} {t2:>5.2f}  {verdict} ({'NG' if d1 else 'OK'}/{'NG' if d2 else 'OK'})")
+    
+    print(f"Verdict agreement: {agree}/{len(files)} (dist_thd = {proc.dist_thd})")
+
+if __name__ == "__main__":
+    parity_report(sys.argv[1] if len(sys.argv) > 1 else "IMAGE")
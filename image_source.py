@@ -0,0 +1,222 @@
+"""
+Archive-backed image references.
+
+An ArchiveMember stands in a batch list wherever a file path would: it is a
+str ("<archive>!/<member>", so os.path.basename gives the member's file name)
+that also remembers which archive and member it refers to. The engine reads
+its bytes with read_image_bytes and decodes them with cv2.imdecode, so ZIP/7z
+images are analysed without being extracted to a temp folder. 7z members are
+decompressed up front and held in memory up to SEVEN_ZIP_MEMORY_LIMIT bytes
+per batch; beyond that they are spilled to a scratch folder.
+"""
+import atexit
+import os
+import shutil
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Decompressed 7z bytes held in memory per batch; further members go to a scratch folder
+SEVEN_ZIP_MEMORY_LIMIT = 512 * 1024 * 1024
+
+class ArchiveMember(str):
+    """
+    Reference to an image inside a ZIP/7z. data: member bytes kept in memory (7z),
+    spill: file the member was extracted to (7z above the memory limit), else
+    the bytes are read from the archive on demand (ZIP).
+    """
+    def __new__(cls, archive, member, data=None, spill=None):
+        ref = super().__new__(cls, f"{archive}!/{member}")
+        ref.archive = archive
+        ref.member = member
+        ref.data = data
+        ref.spill = spill
+        return ref
+
+    def __reduce__(self):
+        # Keep archive/member/data when sent to a worker process
+        return (ArchiveMember, (self.archive, self.member, self.data, self.spill))
+
+class _SevenZipStore:
+    """Accounts the 7z bytes held in memory and owns the scratch folder of the spilled members."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.held = 0
+        self.folder = None
+
+    def reserve(self, size):
+        """True when size more bytes fit in memory (and are now counted), False to spill."""
+        with self.lock:
+            if self.held + size > SEVEN_ZIP_MEMORY_LIMIT: return False
+            self.held += size
+            return True
+
+    def scratch(self):
+        """A new, empty folder for one archive's spilled members."""
+        with self.lock:
+            if self.folder is None:
+                self.folder = tempfile.mkdtemp(prefix="splicing_7z_")
+            return tempfile.mkdtemp(dir=self.folder)
+
+    def release(self):
+        with self.lock:
+            self.held = 0
+            folder, self.folder = self.folder, None
+        if folder: shutil.rmtree(folder, ignore_errors=True)
+
+_7z_store = _SevenZipStore()
+atexit.register(_7z_store.release)
+
+def release_7z_members():
+    """The previous batch's 7z members are no longer needed: reset the memory budget and delete the spilled files."""
+    _7z_store.release()
+
+# One ZipFile handle per (thread, archive): ZipFile is not safe to share between threads
+_zip_handles = threading.local()
+
+def _zip_handle(archive):
+    handles = getattr(_zip_handles, 'handles', None)
+    if handles is None:
+        handles = _zip_handles.handles = {}
+    z = handles.get(archive)
+    if z is None:
+        z = handles[archive] = zipfile.ZipFile(archive, 'r')
+    return z
+
+def close_archives():
+    """Close the ZIP handles opened by the calling thread."""
+    for z in getattr(_zip_handles, 'handles', {}).values():
+        try: z.close()
+        except: pass
+    _zip_handles.handles = {}
+
+def read_image_bytes(ref):
+    """Encoded bytes of a file path or an ArchiveMember."""
+    if isinstance(ref, ArchiveMember):
+        if ref.data is not None:
+            return ref.data
+        if ref.spill is not None:
+            with open(ref.spill, 'rb') as f:
+                return f.read()
+        return _zip_handle(ref.archive).read(ref.member)
+    with open(ref, 'rb') as f:
+        return f.read()
+
+def image_file_complete(path):
+    """
+    True when an image file being written by another process looks finished:
+    it can be opened and ends with the JPEG EOI marker / PNG IEND chunk.
+    Other formats (or a JPEG with trailing bytes) return None: unknown.
+    """
+    try:
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size < 12: return False
+            f.seek(size - 12)
+            tail = f.read(12)
+    except OSError:
+        return False # Still locked by the writer (Windows) or vanished
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.jpg', '.jpeg'):
+        return True if tail.endswith(b'\xff\xd9') else None
+    if ext == '.png':
+        return True if tail[4:8] == b'IEND' else None
+    return None
+
+def list_zip_members(archive, match):
+    """ArchiveMember refs for the ZIP members whose name passes match(name); bytes are read on demand."""
+    with zipfile.ZipFile(archive, 'r') as z:
+        names = [info.filename for info in z.infolist() if not info.is_dir()]
+    return [ArchiveMember(archive, n) for n in names if match(n)], len(names)
+
+def read_7z_members(archive, match):
+    """
+    ArchiveMember refs for the 7z members whose name passes match(name). 7z is
+    usually solid, so matched members are decompressed in one pass instead of one
+    by one. Their bytes stay in memory while the batch is within
+    SEVEN_ZIP_MEMORY_LIMIT; the rest are written to the scratch folder.
+    """
+    import py7zr # Only needed for 7z input
+    with py7zr.SevenZipFile(archive, mode='r') as z:
+        members = [m for m in z.list() if not m.is_directory]
+    all_names = [m.filename for m in members]
+    sizes = {m.filename: m.uncompressed or 0 for m in members}
+    names = [n for n in all_names if match(n)]
+    if not names:
+        return [], len(all_names)
+
+    if not _7z_store.reserve(sum(sizes[n] for n in names)):
+        # Over the budget: extract straight to disk instead of decompressing into memory
+        folder = _7z_store.scratch()
+        with py7zr.SevenZipFile(archive, mode='r') as z:
+            z.extract(path=folder, targets=names)
+        return [ArchiveMember(archive, n, spill=os.path.join(folder, n)) for n in names
+                if os.path.isfile(os.path.join(folder, n))], len(all_names)
+
+    with py7zr.SevenZipFile(archive, mode='r') as z:
+        if hasattr(z, 'read'):
+            blobs = {n: bio.read() for n, bio in z.read(targets=names).items()}
+        else:
+            blobs = _extract_7z_bytes(z, names)
+    return [ArchiveMember(archive, n, blobs[n]) for n in names if n in blobs], len(all_names)
+
+def load_archive(archive, match):
+    """(refs, n_total) for the members of a .zip / .7z archive whose name passes match(name)."""
+    ext = os.path.splitext(archive)[1].lower()
+    if ext == '.zip':
+        return list_zip_members(archive, match)
+    if ext == '.7z':
+        return read_7z_members(archive, match)
+    return [], 0
+
+def iter_archives(archives, match, workers=1):
+    """
+    Yield (archive, refs, n_total, error) for every archive, loading one archive
+    per worker thread (each with its own ZipFile / SevenZipFile handle) and
+    yielding in completion order. zlib and lzma release the GIL, so several
+    archives are read and inflated in parallel.
+    """
+    workers = max(1, min(int(workers), len(archives)))
+    if workers == 1:
+        for ap in archives:
+            try:
+                refs, n_total = load_archive(ap, match)
+                yield ap, refs, n_total, None
+            except Exception as e:
+                yield ap, [], 0, e
+        return
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(load_archive, ap, match): ap for ap in archives}
+        for fut in as_completed(futures):
+            try:
+                refs, n_total = fut.result()
+                yield futures[fut], refs, n_total, None
+            except Exception as e:
+                yield futures[fut], [], 0, e
+
+def _extract_7z_bytes(z, names):
+    """py7zr >= 1.0 has no read(): extract through an in-memory writer factory, else via a scratch folder."""
+    try:
+        from py7zr.io import BytesIOFactory
+    except ImportError:
+        BytesIOFactory = None
+    if BytesIOFactory is not None:
+        factory = BytesIOFactory(1 << 31)
+        z.extract(targets=names, factory=factory)
+        blobs = {}
+        for n in names:
+            if n in factory.products:
+                bio = factory.get(n)
+                bio.seek(0)
+                blobs[n] = bio.read()
+        return blobs
+
+    blobs = {}
+    with tempfile.TemporaryDirectory(prefix="splicing_7z_") as tmp:
+        z.extract(path=tmp, targets=names)
+        for n in names:
+            with open(os.path.join(tmp, n), 'rb') as f:
+                blobs[n] = f.read()
+    return blobs
@@ -10,13 +10,16 @@ import cv2
 import os
 import time
 import threading
+import io
+import multiprocessing
 import json
-from splicing_logic import SplicingProcessor
+from splicing_logic import SplicingProcessor, DecodePrefetcher, analyze_image_job, get_process_pool, \
+    STAGES, start_stage_timing, stop_stage_timing
+from concurrent.futures import wait, FIRST_COMPLETED
+from result_cache import ResultCache, content_digest
+from seam_prior import SeamPrior
+from image_source import ArchiveMember, read_image_bytes, iter_archives, image_file_complete, release_7z_members
 import re
-import zipfile
-import py7zr
-import tempfile
-import shutil
 from ttkbootstrap.scrolled import ScrolledFrame
 
 VERSION = "1.5.0"
@@ -76,8 +79,19 @@ class SplicingGUI:
         self.rate_thd_var = tk.DoubleVar()
         self.fail_thd_var = tk.IntVar()
         self.check_distortion_var = tk.BooleanVar(value=False)
+        self.fast_distortion_var = tk.BooleanVar(value=False)
         self.dist_thd_var = tk.DoubleVar(value=1.12)
         self.mag_factor_var = tk.DoubleVar(value=1.5)
+        self.batch_workers_var = tk.IntVar(value=1)
+        self.turbo_batch_var = tk.BooleanVar(value=False)
+        self.prefetch_depth_var = tk.IntVar(value=2)
+        self.prefetch_mem_var = tk.IntVar(value=512)
+        self.use_cache_var = tk.BooleanVar(value=True)
+        self.show_timing_var = tk.BooleanVar(value=False)
+        self.multi_seam_var = tk.BooleanVar(value=False)
+        self.seam_prior_var = tk.BooleanVar(value=False)
+        self.result_cache = None # Opened on first use (analysis_cache.sqlite next to the exe)
+        self.seam_prior = None # Loaded on first use (seam_prior.json next to the exe)
         self.version_var = tk.StringVar(value=VERSION)
         
         # Lists to store widgets for dynamic font updates
@@ -97,9 +111,16 @@ class SplicingGUI:
         self.hide_result_overlay = False # Temporary flag for hover
         self.hide_result_permanently = False # v1.2.9+: Persistent hide after first hover
         self.zip_filter_var = tk.StringVar(value="4cam_cam")
-        self.temp_extract_dir = None # For ZIP extraction
         self.file_source_map = {} # v1.7.5: Map filepath -> source name (folder or zip)
+        self.is_loading = False # Background folder/archive load in progress
+        self.load_generation = 0 # Bumped per load so a superseded loader's chunks are dropped
+        self.load_cond = threading.Condition() # Guards batch_files growth during loading
+        self.watch_folder = None # Folder being watched (production mode), else None
+        self.watch_stop = None # Event that stops the watcher thread (see stop_watch)
+        self.watch_arrivals = {} # path -> file-close time (mtime) of files that arrived while watching
+        self.watch_latencies = [] # file-close -> verdict seconds
         self._hover_timer = None # v1.7.5: Timer for grid hover delay
+        self._regrade_timer = None # Debounce for fail threshold re-grading
         
         self.load_config()
         self.setup_ui()
@@ -131,7 +152,7 @@ class SplicingGUI:
         btn_container = ttk.Frame(self.left_panel)
         btn_container.pack(fill=X, pady=10)
         
-        # Row 1: Load Actions (3 columns)
+        # Row 1: Load Actions (4 columns)
         row1 = ttk.Frame(btn_container)
         row1.pack(fill=X)
         
@@ -150,6 +171,11 @@ class SplicingGUI:
         self.font_widgets_buttons.append(btn_load_zip)
         ToolTip(btn_load_zip, text="選擇 ZIP/7z 檔案進行分析")
         
+        self.watch_btn = ttk.Button(row1, text="👁️ 監看資料夾", bootstyle=(INFO, OUTLINE), command=self.toggle_watch_folder, cursor="hand2")
+        self.watch_btn.pack(side=LEFT, fill=X, expand=YES, padx=1, pady=2)
+        self.font_widgets_buttons.append(self.watch_btn)
+        ToolTip(self.watch_btn, text="產線模式: 持續監看資料夾，新照片寫入完成後自動分析並回報延遲")
+        
         # Row 2: Control & Utils (4 columns)
         row2 = ttk.Frame(btn_container)
         row2.pack(fill=X)
@@ -412,6 +438,33 @@ class SplicingGUI:
         self.auto_clear_chk.pack(anchor=W, pady=(0, 10))
         self.font_widgets_labels.append(self.auto_clear_chk)
         ToolTip(self.auto_clear_chk, text="啟用後，載入新圖片或資料夾時會自動清除之前的日誌內容。")
+        
+        self.turbo_chk = ttk.Checkbutton(param_frame, text="⚡ 極速批次模式 (Turbo Batch)", 
+                                        variable=self.turbo_batch_var, bootstyle="round-toggle")
+        self.turbo_chk.pack(anchor=W, pady=(0, 10))
+        self.font_widgets_labels.append(self.turbo_chk)
+        self.cache_chk = ttk.Checkbutton(param_frame, text="💾 結果快取 (Result Cache)", 
+                                        variable=self.use_cache_var, bootstyle="round-toggle")
+        self.cache_chk.pack(anchor=W, pady=(0, 10))
+        self.font_widgets_labels.append(self.cache_chk)
+        ToolTip(self.cache_chk, text="以影像內容雜湊 + 參數 + 引擎版本記錄分析結果 (analysis_cache.sqlite)。\n相同影像與參數再次分析時直接讀取結果，不需重新解碼。")
+        self.timing_chk = ttk.Checkbutton(param_frame, text="⏱️ 顯示階段耗時 (Stage Timing)", 
+                                         variable=self.show_timing_var, bootstyle="round-toggle")
+        self.timing_chk.pack(anchor=W, pady=(0, 10))
+        self.font_widgets_labels.append(self.timing_chk)
+        ToolTip(self.timing_chk, text="在 spec_issue 日誌區塊加入 timing: 段落 (decode / Find_Center_ROI / slides / pixel shift / discontinuity / distortion 毫秒)。\n耗時一律記錄並匯出到 CSV 與儀表板。")
+        self.multi_seam_chk = ttk.Checkbutton(param_frame, text="🧵 多拼接縫模式 (Multi-seam)", 
+                                             variable=self.multi_seam_var, bootstyle="round-toggle")
+        self.multi_seam_chk.pack(anchor=W, pady=(0, 10))
+        self.font_widgets_labels.append(self.multi_seam_chk)
+        ToolTip(self.multi_seam_chk, text="一次解碼後分析畫面中找到的所有拼接縫 (cam30 / cam01 / cam12 / cam23)，\n每條拼接縫輸出各自的 spec_issue 區塊；任一拼接縫不合格即判 SPEC_FAIL。\n此模式不播放掃描動畫。")
+        self.seam_prior_chk = ttk.Checkbutton(param_frame, text="📍 接縫位置預測 (Seam Prior)", 
+                                             variable=self.seam_prior_var, bootstyle="round-toggle")
+        self.seam_prior_chk.pack(anchor=W, pady=(0, 10))
+        self.font_widgets_labels.append(self.seam_prior_chk)
+        ToolTip(self.seam_prior_chk, text="依檔名相機 (camXX) 記住最近的拼接縫標記位置 (seam_prior.json)，\nFind_Center_ROI 先只搜尋 (與條帶解碼) 預測區域，找不到完整標記才回到四窗格全搜尋。\n分析結束時日誌顯示命中率。多拼接縫模式不使用。")
+        
+        ToolTip(self.turbo_chk, text="「全部分析」時略過 SCANNING 動畫、箭頭與停頓，只顯示最終結果與網格顏色。\n單張分析仍保留完整動畫 (展示用)。")
 
         # Distortion Check Toggle
         self.distortion_chk = ttk.Checkbutton(param_frame, text="✅ 檢查畸變 (Distortion Check)", 
@@ -420,6 +473,13 @@ class SplicingGUI:
         self.font_widgets_labels.append(self.distortion_chk)
         ToolTip(self.distortion_chk, text="額外掃描圖片其他區域，檢查幾何形狀是否發生不合理扭曲（例如圓形變橢圓）。")
         
+        # Connected-component distortion engine
+        self.fast_distortion_chk = ttk.Checkbutton(param_frame, text="⚡ 快速畸變引擎 (Component Moments)", 
+                                                  variable=self.fast_distortion_var, bootstyle="round-toggle")
+        self.fast_distortion_chk.pack(anchor=W, pady=(0, 20))
+        self.font_widgets_labels.append(self.fast_distortion_chk)
+        ToolTip(self.fast_distortion_chk, text="以連通區域 + 二階矩橢圓一次計算所有色塊，取代逐一輪廓 fitEllipse。\n速度較快，數值與輪廓模式略有差異（比對報告: python distortion_parity.py IMAGE）。")
+        
         # Parameters Grid Container for tight alignment (Left-aligned)
         param_grid = ttk.Frame(param_frame)
         param_grid.pack(fill=X, pady=10)
@@ -474,12 +534,38 @@ class SplicingGUI:
         self.fail_slider = ttk.Scale(param_grid, from_=1, to=15, variable=self.fail_thd_var, orient=HORIZONTAL, length=250)
         self.fail_slider.grid(row=3, column=1, sticky=W)
         ToolTip(self.fail_slider, text="[判定標準線]\n單點 Pixel Shift 允許的最大像素位移。\n超過此值(NG)該點標示為紅色。建議：4")
-        self.fail_thd_var.trace_add("write", lambda *args: self.update_labels())
+        self.fail_thd_var.trace_add("write", lambda *args: (self.update_labels(), self.schedule_regrade()))
 
         self.fail_label = ttk.Label(param_grid, text="4", font=("Helvetica", 12, "bold"), width=5, anchor=W)
         self.fail_label.grid(row=3, column=2, sticky=W, pady=10, padx=(20, 0))
         self.font_widgets_labels.append(self.fail_label)
 
+        # Parallel batch workers row
+        lbl_workers = ttk.Label(param_grid, text="平行分析程序數 (Batch Workers):", font=("Helvetica", 12), width=40)
+        lbl_workers.grid(row=4, column=0, sticky=W, pady=10)
+        self.font_widgets_labels.append(lbl_workers)
+        
+        self.workers_spin = ttk.Spinbox(param_grid, from_=1, to=max(1, os.cpu_count() or 1), textvariable=self.batch_workers_var, width=5)
+        self.workers_spin.grid(row=4, column=1, sticky=W)
+        ToolTip(self.workers_spin, text="[批次平行處理]\n「全部分析」時同時分析的影像數 (每張一個程序)。\n1 = 逐張分析並顯示掃描動畫。建議：CPU 核心數")
+
+        # Decode-ahead prefetch rows
+        lbl_prefetch = ttk.Label(param_grid, text="預先解碼張數 (Prefetch Depth):", font=("Helvetica", 12), width=40)
+        lbl_prefetch.grid(row=5, column=0, sticky=W, pady=10)
+        self.font_widgets_labels.append(lbl_prefetch)
+        
+        self.prefetch_spin = ttk.Spinbox(param_grid, from_=1, to=16, textvariable=self.prefetch_depth_var, width=5)
+        self.prefetch_spin.grid(row=5, column=1, sticky=W)
+        ToolTip(self.prefetch_spin, text="[預先解碼]\n逐張批次分析時，背景先讀取並解碼後續幾張影像。建議：2")
+        
+        lbl_prefetch_mem = ttk.Label(param_grid, text="預先解碼記憶體上限 (Prefetch MB):", font=("Helvetica", 12), width=40)
+        lbl_prefetch_mem.grid(row=6, column=0, sticky=W, pady=10)
+        self.font_widgets_labels.append(lbl_prefetch_mem)
+        
+        self.prefetch_mem_spin = ttk.Spinbox(param_grid, from_=0, to=8192, increment=128, textvariable=self.prefetch_mem_var, width=6)
+        self.prefetch_mem_spin.grid(row=6, column=1, sticky=W)
+        ToolTip(self.prefetch_mem_spin, text="[記憶體上限]\n預先解碼影像佔用的最大記憶體 (完整影像約 88 MB/張)。\n至少保留一張，避免停頓。建議：512")
+
         # v1.2.6: Archive Filter Keyword Setting
         ttk.Separator(param_frame, orient=HORIZONTAL).pack(fill=X, pady=15)
         
@@ -523,8 +609,20 @@ class SplicingGUI:
             "fail_thd": self.DEFAULT_FAIL,
             "gui_font_size": 12,
             "check_distortion": False,
+            "dist_engine": "contour",
             "dist_thd": 1.12,
             "mag_factor": 1.5,
+            "dist_workers": min(8, os.cpu_count() or 1),
+            "archive_workers": min(4, os.cpu_count() or 1),
+            "watch_interval_s": 0.3,
+            "batch_workers": 1,
+            "turbo_batch": False,
+            "prefetch_depth": 2,
+            "prefetch_mem_mb": 512,
+            "use_cache": True,
+            "show_timing": False,
+            "multi_seam": False,
+            "seam_prior": False,
             "img_sidebar_width": 240
         }
         
@@ -542,8 +640,17 @@ class SplicingGUI:
         self.fail_thd_var.set(self.gui_config.get("fail_thd", self.DEFAULT_FAIL))
         self.gui_font_size_var.set(self.gui_config.get("gui_font_size", 12))
         self.check_distortion_var.set(self.gui_config.get("check_distortion", False))
+        self.fast_distortion_var.set(self.gui_config.get("dist_engine", "contour") == "components")
         self.dist_thd_var.set(self.gui_config.get("dist_thd", 1.12))
         self.mag_factor_var.set(self.gui_config.get("mag_factor", 1.5))
+        self.batch_workers_var.set(self.gui_config.get("batch_workers", 1))
+        self.turbo_batch_var.set(self.gui_config.get("turbo_batch", False))
+        self.prefetch_depth_var.set(self.gui_config.get("prefetch_depth", 2))
+        self.prefetch_mem_var.set(self.gui_config.get("prefetch_mem_mb", 512))
+        self.use_cache_var.set(self.gui_config.get("use_cache", True))
+        self.show_timing_var.set(self.gui_config.get("show_timing", False))
+        self.multi_seam_var.set(self.gui_config.get("multi_seam", False))
+        self.seam_prior_var.set(self.gui_config.get("seam_prior", False))
         self.last_dir = self.gui_config.get("last_dir", self.last_dir)
         
         # Apply window geometry
@@ -563,8 +670,20 @@ class SplicingGUI:
             self.gui_config["fail_thd"] = self.fail_thd_var.get()
             self.gui_config["gui_font_size"] = self.gui_font_size_var.get()
             self.gui_config["check_distortion"] = self.check_distortion_var.get()
+            self.gui_config["dist_engine"] = "components" if self.fast_distortion_var.get() else "contour"
             self.gui_config["dist_thd"] = self.dist_thd_var.get()
             self.gui_config["mag_factor"] = self.mag_factor_var.get()
+            self.gui_config["turbo_batch"] = self.turbo_batch_var.get()
+            self.gui_config["use_cache"] = self.use_cache_var.get()
+            self.gui_config["show_timing"] = self.show_timing_var.get()
+            self.gui_config["multi_seam"] = self.multi_seam_var.get()
+            self.gui_config["seam_prior"] = self.seam_prior_var.get()
+            try: self.gui_config["batch_workers"] = max(1, int(self.batch_workers_var.get()))
+            except: pass
+            try:
+                self.gui_config["prefetch_depth"] = max(1, int(self.prefetch_depth_var.get()))
+                self.gui_config["prefetch_mem_mb"] = max(0, int(self.prefetch_mem_var.get()))
+            except: pass
             
             # CRITICAL: Only save width if the widget is actually drawn (>10px)
             # This prevents saving 1px width when closing while on a different tab.
@@ -581,9 +700,6 @@ class SplicingGUI:
 
     def on_close(self):
         self.save_config()
-        if self.temp_extract_dir and os.path.exists(self.temp_extract_dir):
-            try: shutil.rmtree(self.temp_extract_dir)
-            except: pass
         self.root.destroy()
 
     def restore_sash(self):
@@ -761,6 +877,7 @@ class SplicingGUI:
     def clear_log(self):
         """Full System Reset (v1.8.7): Restore GUI to 'just opened' state"""
         # 1. Clear Data States
+        self.cancel_loading()
         self.log_area.delete('1.0', END)
         self.batch_files = []
         self.batch_index = 0
@@ -780,12 +897,6 @@ class SplicingGUI:
         self.bookmark_canvas.delete("all") # Clear Grid
         self.update_dashboard_empty() # Reset Statistics
         
-        # 4. Clean temp refs
-        if self.temp_extract_dir and os.path.exists(self.temp_extract_dir):
-            try: shutil.rmtree(self.temp_extract_dir)
-            except: pass
-        self.temp_extract_dir = None
-        
         self.log("系統已全面清空並恢復初始化狀態。")
 
     def copy_log(self):
@@ -798,6 +909,10 @@ class SplicingGUI:
             self.log(f"複製失敗: {str(e)}")
 
     def load_pil_image(self, path):
+        if isinstance(path, ArchiveMember):
+            img = Image.open(io.BytesIO(read_image_bytes(path)))
+            img.load()
+            return img
         try:
             # Simple loading, handle special characters by reading bytes
             with open(path, 'rb') as f:
@@ -816,6 +931,7 @@ class SplicingGUI:
             self.last_dir = os.path.dirname(path)
             if self.auto_clear_log_var.get():
                 self.clear_log()
+            self.cancel_loading()
             self.current_image_path = path
             self.batch_files = [path]
             self.batch_index = 0
@@ -836,187 +952,317 @@ class SplicingGUI:
         
         keyword = self.zip_filter_var.get().strip()
         self.log(f"開始載入壓縮檔，使用設定值過濾: '{keyword}'")
-        self._process_archive_files(archive_paths, keyword)
-
-    def _get_unique_temp_path(self, fname):
-        """Generate a unique path in temp directory (v1.2.1)"""
-        if not self.temp_extract_dir:
-            self.temp_extract_dir = tempfile.mkdtemp(prefix="splicing_tool_")
-        target_path = os.path.join(self.temp_extract_dir, fname)
-        counter = 1
-        name_part, ext_part = os.path.splitext(fname)
-        while os.path.exists(target_path):
-            target_path = os.path.join(self.temp_extract_dir, f"{name_part}_{counter}{ext_part}")
-            counter += 1
-        return target_path
-
-    def _process_archive_files(self, archive_paths, keyword):
-        """Extract filtered files from ZIP or 7z to temp directory (Robust Flatten Logic)."""
-        if not self.temp_extract_dir:
-            self.temp_extract_dir = tempfile.mkdtemp(prefix="splicing_tool_")
-        
-        self.file_source_map = {} # v1.7.5 Reset mapping
-        extracted_files = []
+        # Update source label for archives
+        if len(archive_paths) == 1:
+            self.source_label.config(text=f"📦 當前壓縮檔: {os.path.basename(archive_paths[0])}")
+        else:
+            self.source_label.config(text=f"📦 多重壓縮檔 ({len(archive_paths)} 個)")
+        self.begin_progressive_load(self._process_archive_files, archive_paths, keyword)
+
+    def _process_archive_files(self, gen, archive_paths, keyword):
+        """
+        Loader thread: list filtered images of ZIP or 7z archives as ArchiveMember refs (no temp extraction).
+        ZIP members are read on demand; 7z members are decompressed once into memory.
+        Archives are read in parallel (config "archive_workers") and each one's
+        matches are handed to the GUI as soon as it is read.
+        """
         exts = ('.jpg', '.jpeg', '.png', '.bmp')
         
+        def match(name):
+            fname = os.path.basename(name).lower()
+            return fname.endswith(exts) and (not keyword or keyword.lower() in fname)
+        
+        n_loaded = 0
         for ap in archive_paths:
-            ext = os.path.splitext(ap)[1].lower()
+            self.log(f"正在分析壓縮檔: {os.path.basename(ap)} ...")
+        # One archive per worker thread; each archive is posted as soon as it has been read
+        workers = max(1, int(self.gui_config.get("archive_workers", 1)))
+        for ap, refs, archives_found, err in iter_archives(archive_paths, match, workers):
+            if gen != self.load_generation: return # Superseded by a newer load / reset
             a_name = os.path.basename(ap)
-            self.log(f"正在分析壓縮檔: {a_name} ...")
-            
-            archives_found = 0
-            archives_matched = 0
-            
-            try:
-                if ext == '.zip':
-                    with zipfile.ZipFile(ap, 'r') as z:
-                        for info in z.infolist():
-                            if info.is_dir(): continue
-                            archives_found += 1
-                            f_in_zip = info.filename
-                            fname = os.path.basename(f_in_zip)
-                            
-                            if any(fname.lower().endswith(e) for e in exts):
-                                if not keyword or keyword.lower() in fname.lower():
-                                    archives_matched += 1
-                                    target_path = self._get_unique_temp_path(fname)
-                                    with z.open(f_in_zip) as source, open(target_path, "wb") as target:
-                                        shutil.copyfileobj(source, target)
-                                    extracted_files.append(target_path)
-                                    self.file_source_map[target_path] = a_name
-                                    
-                elif ext == '.7z':
-                    with py7zr.SevenZipFile(ap, mode='r') as z:
-                        # 1. Scan and find matches
-                        to_extract = []
-                        members = z.list()
-                        for m in members:
-                            if m.is_directory: continue
-                            archives_found += 1
-                            fname = os.path.basename(m.filename)
-                            if any(fname.lower().endswith(e) for e in exts):
-                                if not keyword or keyword.lower() in fname.lower():
-                                    archives_matched += 1
-                                    to_extract.append(m.filename)
-                        
-                        if to_extract:
-                            # 2. Extract matches in ONE GO to a sub-temporary folder
-                            sub_root = tempfile.mkdtemp(dir=self.temp_extract_dir)
-                            z.extract(targets=to_extract, path=sub_root)
-                            
-                            # 3. Walk and Flatten
-                            for root, dirs, files in os.walk(sub_root):
-                                for f in files:
-                                    if any(f.lower().endswith(e) for e in exts):
-                                        if not keyword or keyword.lower() in f.lower():
-                                            src_path = os.path.join(root, f)
-                                            dst_path = self._get_unique_temp_path(f)
-                                            shutil.move(src_path, dst_path)
-                                            extracted_files.append(dst_path)
-                                            self.file_source_map[dst_path] = a_name
-                            
-                            # 4. Clean up sub-root
-                            try: shutil.rmtree(sub_root)
-                            except: pass
-                
-                self.log(f"  -> {a_name}: 總計 {archives_found} 檔案, 符合篩選 {archives_matched} 個。")
-                                
-            except Exception as e:
-                self.log(f"讀取壓縮檔 {a_name} 失敗: {str(e)}")
-
-        if extracted_files:
-            # Update source label for archives
-            if len(archive_paths) == 1:
-                self.source_label.config(text=f"📦 當前壓縮檔: {os.path.basename(archive_paths[0])}")
-            else:
-                self.source_label.config(text=f"📦 多重壓縮檔 ({len(archive_paths)} 個)")
-                
-            self.analysis_history = {} # Reset for new batch
-            self.batch_files = extracted_files
-            self.batch_index = 0
-            self.current_image_path = self.batch_files[0]
-            self.display_image(self.current_image_path)
-            self.update_nav_ui()
-            self.notebook.select(0)
-            
-            msg = f"載入成功！共從壓縮檔中提取 {len(extracted_files)} 張符合關鍵字 '{keyword}' 的圖片。"
-            self.log(msg)
-            
-            if self.auto_analyze_var.get():
-                self.start_analysis(mode="all")
+            if err is not None:
+                self.log(f"讀取壓縮檔 {a_name} 失敗: {str(err)}")
+                continue
+            self.post_loaded_files(gen, refs, a_name)
+            n_loaded += len(refs)
+            self.log(f"  -> {a_name}: 總計 {archives_found} 檔案, 符合篩選 {len(refs)} 個。")
+
+        def _done():
+            if n_loaded:
+                msg = f"載入成功！共從壓縮檔中提取 {n_loaded} 張符合關鍵字 '{keyword}' 的圖片。"
+                self.log(msg)
+                self.status_var.set(f"載入成功: {n_loaded} 張")
             else:
-                self.clear_previews()
-        else:
-            self.log(f"找不到符合關鍵字 '{keyword}' 的影像檔案。")
+                self.log(f"找不到符合關鍵字 '{keyword}' 的影像檔案。")
+        self.root.after(0, self.finish_loading, gen, _done)
 
     def load_folder(self):
         folder = filedialog.askdirectory(initialdir=self.last_dir)
         if not folder: return
         
+        self.last_dir = folder
+        if self.auto_clear_log_var.get():
+            self.clear_log()
+        
+        # Update source label immediately for feedback
+        self.source_label.config(text=f"📂 當前資料夾: {os.path.basename(folder)}")
+        self.begin_progressive_load(self._scan_folder, folder, self.zip_filter_var.get().strip().lower())
+
+    def _scan_folder(self, gen, folder, keyword):
+        """
+        Loader thread: list the folder (slow on a NAS) and hand matched images to
+        the GUI in chunks while scanning, so analysis can start on the first ones.
+        """
+        valid_exts = ('.jpg', '.jpeg', '.png', '.bmp')
+        folder_name = os.path.basename(folder)
+        all_files_cnt = 0
+        all_imgs = 0
+        first_files = []
+        chunk = []
+        n_loaded = 0
+        t_post = time.perf_counter()
         try:
-            self.last_dir = folder
-            if self.auto_clear_log_var.get():
-                self.clear_log()
-            
-            # Update source label immediately for feedback
-            self.source_label.config(text=f"📂 當前資料夾: {os.path.basename(folder)}")
-            
-            # v1.6.1: Improved Diagnostic - list ALL files first for troubleshooting
-            # Added .jpeg support
-            itms = os.listdir(folder)
-            all_files_cnt = len([f for f in itms if os.path.isfile(os.path.join(folder, f))])
-            valid_exts = ('.jpg', '.jpeg', '.png', '.bmp')
-            all_imgs = [f for f in itms if f.lower().endswith(valid_exts)]
-            
-            self.log(f"正在掃描資料夾: {folder} (共找到 {all_files_cnt} 個檔案)")
-            
-            keyword = self.zip_filter_var.get().strip().lower()
-            self.file_source_map = {} # v1.7.5 Reset mapping
-            if keyword:
-                self.batch_files = [os.path.join(folder, f) for f in all_imgs if keyword in f.lower()]
-            else:
-                self.batch_files = [os.path.join(folder, f) for f in all_imgs]
-            
-            # Populate mapping for folder mode
-            folder_name = os.path.basename(folder)
-            for path in self.batch_files:
-                self.file_source_map[path] = folder_name
-
-            if self.batch_files:
-                self.analysis_history = {}
-                self.batch_index = 0
-                self.current_image_path = self.batch_files[0]
-                
-                # Force UI Update sequence
-                self.update_nav_ui()
-                self.display_image(self.current_image_path)
-                self.notebook.select(0)
-                
+            self.log(f"正在掃描資料夾: {folder}")
+            # v1.6.1: Improved Diagnostic - count ALL files for troubleshooting
+            with os.scandir(folder) as it:
+                for entry in it:
+                    if gen != self.load_generation: return # Superseded by a newer load / reset
+                    try:
+                        if not entry.is_file(): continue
+                    except OSError:
+                        continue
+                    all_files_cnt += 1
+                    if len(first_files) < 3: first_files.append(entry.name)
+                    f = entry.name
+                    if not f.lower().endswith(valid_exts): continue
+                    all_imgs += 1
+                    if keyword and keyword not in f.lower(): continue
+                    chunk.append(os.path.join(folder, f))
+                    # Post the first match right away, then in chunks (grid redraw is O(n))
+                    if n_loaded == 0 or len(chunk) >= 64 or time.perf_counter() - t_post > 0.5:
+                        self.post_loaded_files(gen, chunk, folder_name)
+                        n_loaded += len(chunk)
+                        chunk = []
+                        t_post = time.perf_counter()
+            if chunk:
+                self.post_loaded_files(gen, chunk, folder_name)
+                n_loaded += len(chunk)
+        except Exception as e:
+            err = str(e)
+            def _fail():
+                self.log(f"載入資料夾時發生未預期錯誤: {err}")
+                self.status_var.set("載入異常")
+            self.root.after(0, self.finish_loading, gen, _fail)
+            return
+
+        def _done():
+            self.log(f"資料夾掃描完成 (共找到 {all_files_cnt} 個檔案)")
+            if n_loaded:
                 filter_msg = f" (關鍵字篩選: '{keyword}')" if keyword else ""
-                log_msg = f"載入成功: 已從 {len(all_imgs)} 張符合格式的照片中，載入 {len(self.batch_files)} 張{filter_msg}"
+                log_msg = f"載入成功: 已從 {all_imgs} 張符合格式的照片中，載入 {n_loaded} 張{filter_msg}"
                 self.log(log_msg)
-                self.status_var.set(f"載入成功: {len(self.batch_files)} 張")
-                
-                if self.auto_analyze_var.get():
-                    self.start_analysis(mode="all")
-                else:
-                    self.clear_previews()
+                self.status_var.set(f"載入成功: {n_loaded} 張")
+            elif keyword and all_imgs:
+                msg = f"資料夾內有 {all_imgs} 張照片，但檔名皆不包含關鍵字 '{keyword}'。"
+                self.log(msg)
+                tk.messagebox.showwarning("篩選結果為空", msg)
             else:
-                if keyword and all_imgs:
-                    msg = f"資料夾內有 {len(all_imgs)} 張照片，但檔名皆不包含關鍵字 '{keyword}'。"
-                    self.log(msg)
-                    tk.messagebox.showwarning("篩選結果為空", msg)
-                else:
-                    # v1.6.2: Add hint of what WAS found to help user realize if they chose wrong folder
-                    other_files = [f for f in itms if os.path.isfile(os.path.join(folder, f))][:3]
-                    hint = f"\n資料夾內的前幾個檔案為: {', '.join(other_files)}" if other_files else "\n資料夾完全為空。"
-                    msg = f"未發現支援格式 (*.jpg, *.jpeg, *.png, *.bmp)。\n資料夾檔案總數: {all_files_cnt}{hint}"
-                    self.log(msg)
-                    tk.messagebox.showerror("載入失敗", msg)
-                    self.status_var.set("無效資料夾")
-        except Exception as e:
-            self.log(f"載入資料夾時發生未預期錯誤: {str(e)}")
-            self.status_var.set("載入異常")
+                # v1.6.2: Add hint of what WAS found to help user realize if they chose wrong folder
+                hint = f"\n資料夾內的前幾個檔案為: {', '.join(first_files)}" if first_files else "\n資料夾完全為空。"
+                msg = f"未發現支援格式 (*.jpg, *.jpeg, *.png, *.bmp)。\n資料夾檔案總數: {all_files_cnt}{hint}"
+                self.log(msg)
+                tk.messagebox.showerror("載入失敗", msg)
+                self.status_var.set("無效資料夾")
+        self.root.after(0, self.finish_loading, gen, _done)
+
+    def toggle_watch_folder(self):
+        """Start / stop production watch mode on a folder."""
+        if self.watch_folder:
+            self.stop_watch()
+            return
+        folder = filedialog.askdirectory(initialdir=self.last_dir)
+        if not folder: return
+        
+        self.last_dir = folder
+        if self.auto_clear_log_var.get():
+            self.clear_log()
+        self.source_label.config(text=f"👁️ 監看中: {os.path.basename(folder)}")
+        self.watch_arrivals = {}
+        self.watch_latencies = []
+        self.watch_stop = threading.Event()
+        self.begin_progressive_load(self._watch_folder, folder, self.zip_filter_var.get().strip().lower(), self.watch_stop)
+        # Set after begin_progressive_load: the load never finishes until stop_watch
+        self.watch_folder = folder
+        self.watch_btn.config(text="⏹ 停止監看")
+        self.log(f"開始監看資料夾: {folder}")
+
+    def stop_watch(self):
+        """Stop watching; the analysis finishes the files already queued."""
+        folder = self.watch_folder
+        gen = self.load_generation
+        self.watch_folder = None
+        self.watch_btn.config(text="👁️ 監看資料夾")
+        self.finish_loading(gen)
+        self.watch_stop.set() # Stop the watcher thread; the batch (and its load generation) stays
+        self.source_label.config(text=f"📂 當前資料夾: {os.path.basename(folder)}")
+        self.log(f"停止監看資料夾: {folder}")
+        self.log(self.watch_latency_summary())
+
+    def _watch_folder(self, gen, folder, keyword, stop):
+        """
+        Watcher thread: poll the folder and post image files once fully written.
+        A file is ready when its size and mtime did not change over one poll and its
+        trailer is complete (image_file_complete), so a file still being copied is
+        never decoded. Files present at start are the backlog; for the others the
+        mtime is kept as the file-close time for the latency report.
+        """
+        interval = max(0.05, float(self.gui_config.get("watch_interval_s", 0.3)))
+        valid_exts = ('.jpg', '.jpeg', '.png', '.bmp')
+        folder_name = os.path.basename(folder)
+        seen = set()
+        pending = {} # name -> (size, mtime_ns) seen on the previous poll
+        backlog = None # Names present on the first poll
+        error_logged = False
+        while gen == self.load_generation and not stop.is_set():
+            ready = []
+            first = backlog is None
+            if first: backlog = set()
+            try:
+                with os.scandir(folder) as it:
+                    for entry in it:
+                        f = entry.name
+                        if f in seen: continue
+                        fl = f.lower()
+                        if not fl.endswith(valid_exts) or (keyword and keyword not in fl): continue
+                        try:
+                            st = entry.stat()
+                        except OSError:
+                            continue
+                        sig = (st.st_size, st.st_mtime_ns)
+                        path = os.path.join(folder, f)
+                        if first: backlog.add(f)
+                        if pending.get(f) == sig and image_file_complete(path) is not False:
+                            seen.add(f)
+                            pending.pop(f, None)
+                            ready.append(path)
+                            if f not in backlog:
+                                self.watch_arrivals[path] = st.st_mtime
+                        else:
+                            pending[f] = sig
+                error_logged = False
+            except OSError as e:
+                if not error_logged: # e.g. NAS share dropped; keep polling
+                    self.log(f"監看資料夾讀取失敗: {str(e)}")
+                    error_logged = True
+            if ready and gen == self.load_generation and not stop.is_set():
+                ready.sort()
+                self.post_loaded_files(gen, ready, folder_name)
+                n_new = sum(1 for p in ready if os.path.basename(p) not in backlog)
+                if n_new:
+                    self.log(f"監看: 偵測到 {n_new} 張新照片")
+            time.sleep(interval)
+
+    def note_verdict(self, path):
+        """Record file-close -> verdict latency for files that arrived while watching."""
+        t_close = self.watch_arrivals.pop(path, None)
+        if t_close is None: return
+        latency = max(0.0, time.time() - t_close)
+        self.watch_latencies.append(latency)
+        self.log(f"  監看延遲 (寫入完成 -> 判定): {latency:.2f}s")
+        summary = self.watch_latency_summary()
+        self.root.after(0, lambda: self.status_var.set(summary))
+
+    def watch_latency_summary(self):
+        lat = sorted(self.watch_latencies)
+        if not lat:
+            return "監看延遲: 尚無新照片"
+        p50 = lat[len(lat) // 2]
+        p95 = lat[min(len(lat) - 1, int(len(lat) * 0.95))]
+        return f"監看延遲: {len(lat)} 張, p50 {p50:.2f}s, p95 {p95:.2f}s, max {lat[-1]:.2f}s"
+
+    def begin_progressive_load(self, loader, *args):
+        """
+        Reset the batch and run loader(gen, *args) on a background thread (main thread).
+        The loader hands matched files over with post_loaded_files and ends with finish_loading.
+        """
+        self.load_generation += 1
+        if self.watch_folder: # A new load replaces the watched batch
+            self.watch_folder = None
+            self.watch_btn.config(text="👁️ 監看資料夾")
+        if self.is_analyzing:
+            self.stop_event.set() # The running analysis belongs to the previous batch
+        with self.load_cond:
+            self.is_loading = True
+            self.batch_files = []
+        release_7z_members() # The previous batch's 7z bytes / spilled files
+        self.analysis_history = {} # Reset for new batch
+        self.file_source_map = {} # v1.7.5 Reset mapping
+        self.batch_index = 0
+        self.current_image_path = None
+        self.update_nav_ui()
+        self.status_var.set("載入中...")
+        threading.Thread(target=loader, args=(self.load_generation, *args), daemon=True).start()
+
+    def post_loaded_files(self, gen, files, source_name):
+        """Loader thread -> main thread: append one chunk of matched files."""
+        if files:
+            self.root.after(0, self.append_loaded_files, gen, list(files), source_name)
+
+    def append_loaded_files(self, gen, files, source_name):
+        """Append a loaded chunk to the batch; the first chunk is shown (and analysed) right away."""
+        if gen != self.load_generation: return
+        first = not self.batch_files
+        with self.load_cond:
+            self.batch_files.extend(files)
+            self.load_cond.notify_all()
+        for path in files:
+            self.file_source_map[path] = source_name
+        if self.is_loading:
+            self.status_var.set(f"載入中... {len(self.batch_files)} 張")
+        self.update_nav_ui()
+        
+        if first:
+            self.current_image_path = self.batch_files[0]
+            self.display_image(self.current_image_path)
+            self.notebook.select(0)
+            if self.auto_analyze_var.get() or self.watch_folder:
+                self.start_loaded_analysis(gen)
+            else:
+                self.clear_previews()
+
+    def start_loaded_analysis(self, gen):
+        """Auto-analyse a freshly loading batch once a previous (stopped) run has wound down."""
+        if gen != self.load_generation or not self.batch_files: return
+        if self.is_analyzing:
+            self.root.after(200, self.start_loaded_analysis, gen)
+            return
+        self.start_analysis(mode="all")
+
+    def finish_loading(self, gen, on_done=None):
+        """Loading ended (main thread): lets the running analysis finish once it has caught up."""
+        if gen != self.load_generation: return
+        with self.load_cond:
+            self.is_loading = False
+            self.load_cond.notify_all()
+        if on_done: on_done()
+
+    def cancel_loading(self):
+        """Drop a background load (or folder watch) in progress; its later chunks are ignored."""
+        self.load_generation += 1
+        with self.load_cond:
+            self.is_loading = False
+            self.load_cond.notify_all()
+        release_7z_members()
+        if self.watch_folder:
+            self.watch_folder = None
+            self.watch_btn.config(text="👁️ 監看資料夾")
+
+    def wait_for_batch(self, index):
+        """Analysis thread: wait until batch_files[index] exists. False when loading ended (or stop) without it."""
+        with self.load_cond:
+            while len(self.batch_files) <= index and self.is_loading and not self.stop_event.is_set():
+                self.load_cond.wait(0.2)
+            return len(self.batch_files) > index
 
     def display_image(self, path, overlay_info=None, refresh_log=False):
         if path is None:
@@ -1037,7 +1283,7 @@ class SplicingGUI:
             # Restore snapshots for this image
             self.clear_previews()
             for snap in hist.get('snapshots', []):
-                self.add_preview_thumbnail(snap['img'], snap['index'], snap['status'], snap['shift'], snap['rect'])
+                self.add_preview_thumbnail(snap['img'], snap['index'], snap['status'], snap['shift'], snap['rect'], snap.get('seam'))
 
         try:
             # Use cached image if possible to speed up animation
@@ -1357,7 +1603,8 @@ class SplicingGUI:
         if self.is_analyzing: return
         
         # v1.5.9: If multiple files are loaded, clicking Start Analysis should re-check everything
-        if len(self.batch_files) > 1:
+        # (a batch still loading in the background counts as multiple files)
+        if len(self.batch_files) > 1 or self.is_loading:
             self.analysis_mode = "all"
             self.batch_index = 0 # Reset to start for full re-check
         else:
@@ -1373,30 +1620,238 @@ class SplicingGUI:
         self.processor.diff_thd = int(self.diff_thd_var.get())
         self.processor.rate_thd = self.rate_thd_var.get()
         self.processor.dist_thd = self.dist_thd_var.get()
+        self.processor.dist_workers = max(1, int(self.gui_config.get("dist_workers", 1)))
+        self.processor.dist_engine = "components" if self.fast_distortion_var.get() else "contour"
+        self.processor.seam_prior = self.get_seam_prior()
         
         self.clear_previews()
         threading.Thread(target=self.run_analysis_pipeline, daemon=True).start()
 
     def run_analysis_pipeline(self):
+        gen = self.load_generation # Results of a batch replaced by a new load are dropped
         try:
             self.stop_event.clear()
-            if self.batch_files and self.analysis_mode == "all":
-                # Batch mode: Analyze from current index to the end
-                for i in range(self.batch_index, len(self.batch_files)):
-                    if self.stop_event.is_set(): break
-                    self.current_image_path = self.batch_files[i]
-                    self.batch_index = i
-                    self.process_single_image(self.current_image_path)
+            if self.batch_files and self.analysis_mode == "all" and self.get_batch_workers() > 1 \
+                    and (len(self.batch_files) - self.batch_index > 1 or self.is_loading):
+                # Parallel batch mode: one image per pool worker, results in completion order
+                self.run_parallel_batch(self.batch_index, gen)
+            elif self.batch_files and self.analysis_mode == "all":
+                # Batch mode: Analyze from current index to the end (files still loading
+                # are picked up as they arrive), decoding the next images in the background meanwhile
+                queued = len(self.batch_files)
+                prefetcher = DecodePrefetcher(self.processor, self.batch_files[self.batch_index:queued],
+                                              strip_only=not self.check_distortion_var.get(),
+                                              depth=self.prefetch_depth_var.get(),
+                                              mem_budget_mb=self.prefetch_mem_var.get(),
+                                              complete=not self.is_loading,
+                                              all_seams=self.multi_seam_var.get())
+                try:
+                    i = self.batch_index
+                    while not self.stop_event.is_set() and self.wait_for_batch(i) and gen == self.load_generation:
+                        if len(self.batch_files) > queued:
+                            prefetcher.extend(self.batch_files[queued:], complete=not self.is_loading)
+                            queued = len(self.batch_files)
+                        self.current_image_path = self.batch_files[i]
+                        self.batch_index = i
+                        self.process_single_image(self.current_image_path, prefetcher, gen)
+                        if gen != self.load_generation: break
+                        self.note_verdict(self.current_image_path)
+                        i += 1
+                finally:
+                    prefetcher.close()
             else:
                 # Single mode: Only analyze the currently selected image
-                self.process_single_image(self.current_image_path)
+                self.process_single_image(self.current_image_path, gen=gen)
         except Exception as e:
             self.log(f"執行分析時發生錯誤: {str(e)}")
         finally:
             self.root.after(0, self.analysis_done)
 
-    def process_single_image(self, path):
+    def get_batch_workers(self):
+        try: return max(1, int(self.batch_workers_var.get()))
+        except: return 1
+
+    def run_parallel_batch(self, start_index, gen):
+        """
+        Analyze batch_files[start_index:] on a process pool (analyze_image_job per image).
+        Files appended by a background load are submitted as they arrive; results are
+        tagged with the load generation gen so a replaced batch never receives them.
+        """
+        workers = self.get_batch_workers()
+        settings = self.analysis_settings()
+        p_diff, p_rate, p_fail = int(self.diff_thd_var.get()), self.rate_thd_var.get(), int(self.fail_thd_var.get())
+        cache = self.get_result_cache()
+        pool = get_process_pool(workers)
+        self.log(f"==================================")
+        self.log(f"參數值: Diff={p_diff}, Rate={p_rate:.2f}, Fail={p_fail}px")
+        self.log(f"平行批次分析: {len(self.batch_files) - start_index} 張{' (載入中)' if self.is_loading else ''}, {workers} 個程序")
+        self.log(f"==================================")
+        
+        digests, futures = {}, {}
+        done = n_hits = 0
+        next_i = start_index
+        while not self.stop_event.is_set() and gen == self.load_generation:
+            # Cache hits are applied right away, only the misses go to the pool
+            batch = self.batch_files
+            end = len(batch)
+            for i in range(next_i, end):
+                path = batch[i]
+                if cache:
+                    digests[i], hit = self.cache_lookup(cache, path, settings)
+                    if hit:
+                        done += 1
+                        n_hits += 1
+                        self.root.after(0, self.apply_batch_result, gen, i, path, hit[0], hit[1], done, end - start_index)
+                        continue
+                futures[pool.submit(analyze_image_job, path, settings)] = (i, path)
+            next_i = end
+            
+            if not futures:
+                if not self.wait_for_batch(next_i): break
+                continue
+            finished, _ = wait(futures, timeout=0.2, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                i, path = futures.pop(fut)
+                try:
+                    record, details = fut.result()
+                except Exception as e:
+                    record, details = {'file': os.path.basename(path), 'error': str(e), 'result': "SPEC_FAIL"}, {}
+                if cache and digests.get(i) and details:
+                    try: cache.put(digests[i], settings, details['measurements'], details.get('snapshots', []))
+                    except Exception as e: self.log(f"寫入結果快取失敗: {str(e)}")
+                done += 1
+                # Tk widgets and analysis_history are only touched on the main thread
+                self.root.after(0, self.apply_batch_result, gen, i, path, record, details, done, len(self.batch_files) - start_index)
+        for f in futures: f.cancel()
+        if cache: self.log(f"快取命中 {n_hits} 張")
+
+    def analysis_settings(self):
+        """Parameters of the current run, as used by analyze_image_job and the result cache."""
+        return {
+            'diff_thd': self.processor.diff_thd, 'rate_thd': self.processor.rate_thd,
+            'dist_thd': self.processor.dist_thd, 'dist_engine': self.processor.dist_engine,
+            'fail_thd': int(self.fail_thd_var.get()), 'check_distortion': self.check_distortion_var.get(),
+            'multi_seam': self.multi_seam_var.get(),
+            'seam_prior': self.seam_prior.path if self.processor.seam_prior is not None else None
+        }
+
+    def get_result_cache(self):
+        """Open the on-disk result cache lazily (None when disabled in Settings)."""
+        if not self.use_cache_var.get(): return None
+        if self.result_cache is None:
+            try:
+                self.result_cache = ResultCache(os.path.join(self.base_path, "analysis_cache.sqlite"))
+            except Exception as e:
+                self.log(f"無法開啟結果快取: {str(e)}")
+                return None
+        return self.result_cache
+
+    def get_seam_prior(self):
+        """Per-camera seam location prior, loaded lazily (None when disabled)."""
+        if not self.seam_prior_var.get(): return None
+        if self.seam_prior is None:
+            self.seam_prior = SeamPrior(os.path.join(self.base_path, "seam_prior.json"))
+        return self.seam_prior
+
+    def cache_lookup(self, cache, path, settings):
+        """Returns (digest, hit) where hit is (record, details) rebuilt from the cache, or None."""
+        try:
+            digest = content_digest(path)
+        except Exception:
+            return None, None
+        hit = cache.get(digest, settings)
+        if not hit: return digest, None
+        measurements, snapshots = hit
+        record = self.processor.build_record(path, measurements)
+        record = self.processor.grade_record(record, settings['fail_thd'])
+        return digest, (record, {'snapshots': snapshots, 'measurements': measurements, 'cached': True})
+
+    def apply_batch_result(self, gen, index, path, record, details, done, total):
+        """Store one parallel-batch result and refresh the grid (main thread)."""
+        if gen != self.load_generation: return # Queued before a new load replaced the batch
+        self.batch_index = index
+        self.current_image_path = path
+        self.log(f"正在分析: {os.path.basename(path)}...")
+        self.apply_record(path, record, details)
+        if self.seam_prior is not None and details.get('seam_prior'):
+            self.seam_prior.merge(details['seam_prior'], details['seam_prior']['pid'])
+        
+        self.status_var.set(f"平行分析中... {done} / {total}")
+        self.note_verdict(path)
+        self.update_nav_ui()
+        if done == total:
+            self.display_image(path)
+
+    def apply_record(self, path, record, details):
+        """
+        Store an analyze_image record for path: analysis_history (snapshots, overlay,
+        record), CSV rows and the spec_issue log. No Tk calls, so it is safe on the
+        analysis thread; log lines go to current_image_path, which must be path.
+        """
+        hist = {'snapshots': [], 'overlay': None, 'log_entries': []}
+        self.analysis_history[path] = hist
+        
+        if details.get('cached'):
+            self.log("  (結果快取命中 Cache hit)")
+        if record.get('error'):
+            self.log(f"  [NG] {os.path.basename(path)}: {record['error']}")
+        
+        # Multi-seam records: targets of every seam, labelled "cam01:0" (see record_targets)
+        snapshots = details.get('snapshots', [])
+        multi_seam = bool(record.get('seams'))
+        for snap, (label, shift, is_pass, roi_err) in zip(snapshots, self.processor.record_targets(record)):
+            status_tag = 'pass' if is_pass else 'fail'
+            img = snap['img']
+            if roi_err:
+                img = np.zeros((100, 280, 3), dtype=np.uint8)
+                cv2.putText(img, "ROI ERROR", (50, 60), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 255), 3)
+            hist['snapshots'].append({'img': img, 'index': snap['index'], 'status': status_tag, 'shift': shift, 'rect': snap['rect'],
+                                      'seam': label.split(":")[0] if multi_seam else None})
+            self.results_data.append([os.path.basename(path), label, shift,
+                                      'PASS' if is_pass else 'FAIL', time.strftime("%H:%M:%S"), path])
+            fail_msg = "" if is_pass else f" (THRESHOLD {record['fail_thd']}px)"
+            self.log(f"  Target {label}: {shift} px -> {'PASS' if is_pass else 'FAIL'}{fail_msg}")
+        
+        # One spec_issue block per seam (multi-seam) or for the image
+        for block in record.get('seams') or [record]:
+            if 'shifts' not in block:
+                if block is not record:
+                    self.log(f"  [NG] {block['cam']}: {block.get('error')}")
+                continue
+            cam_id = block['cam']
+            self.log("\nspec_issue:")
+            for i in range(len(block['shifts'])):
+                self.log(f"{cam_id}:MAX_PixelsShift_{i}={block[f'MAX_PixelsShift_{i}']}")
+            for i in range(len(block['shifts'])):
+                self.log(f"{cam_id}:Brightness_discontinue_{i}={block[f'Brightness_discontinue_{i}']:.1f}")
+                self.log(f"{cam_id}:red_discontinue_{i}={block[f'red_discontinue_{i}']:.1f}")
+                self.log(f"{cam_id}:green_discontinue_{i}={block[f'green_discontinue_{i}']:.1f}")
+                self.log(f"{cam_id}:blue_discontinue_{i}={block[f'blue_discontinue_{i}']:.1f}")
+            self.log(f"pixel_shift_avg = {block['pixel_shift_avg']}")
+        
+        dist = record.get('distortion')
+        if dist:
+            state = "[NG] 偵測到明顯畸變" if dist['is_distorted'] else "[OK] 幾何形狀正常"
+            self.log(f"  {state} (最大變形比率: {dist['max_ecc']}, 樣本數: {dist['shape_cnt']})")
+        
+        if details.get('timing'):
+            hist['timing'] = details['timing']
+            self.log_timing(details['timing'])
+        
+        image_pass = record['result'] == "SPEC_PASS"
+        self.log(record['result'])
+        self.log("----------------------------------")
+        
+        hist['overlay'] = {'final_result': 'pass' if image_pass else 'fail'}
+        hist['is_pass'] = image_pass
+        hist['record'] = record
+        return image_pass
+
+    def process_single_image(self, path, prefetcher=None, gen=None):
+        """Analyse path on the analysis thread; nothing is stored once the load generation gen is replaced."""
+        start_stage_timing() # Engine stages only: animation sleeps are not counted
         try:
+            if gen is not None and gen != self.load_generation: return
             # v1.2.1: Always ensure history entry exists so navigation squares update
             if path not in self.analysis_history:
                 self.analysis_history[path] = {'snapshots': [], 'overlay': None, 'log_entries': []}
@@ -1407,11 +1862,16 @@ class SplicingGUI:
                 self.analysis_history[path]['log_entries'] = []
                 self.log_area.delete('1.0', END)
             
+            # Turbo batch: no SCANNING animation / arrow / pauses, only the final overlay and grid colour
+            # (always in watch mode, where file-close -> verdict latency matters)
+            turbo = self.analysis_mode == "all" and (self.turbo_batch_var.get() or bool(self.watch_folder))
+            
             # v1.3.1: We must NOT recall old thumbnails during analysis redraw
             self.root.after(0, self.clear_previews) 
-            self.root.after(0, lambda p=path: self.display_image(p))
-            # Critical: Allow UI to draw the basic image first
-            time.sleep(0.1) 
+            if not turbo:
+                self.root.after(0, lambda p=path: self.display_image(p))
+                # Critical: Allow UI to draw the basic image first
+                time.sleep(0.1) 
             
             # Print current parameter info in the log (v1.1)
             p_diff = int(self.diff_thd_var.get())
@@ -1423,16 +1883,54 @@ class SplicingGUI:
             
             self.log(f"正在分析: {os.path.basename(path)}...")
             
-            result = self.processor.analyze_image_prepare(path)
+            # Result cache: a hit rebuilds history/log/CSV without decoding the image
+            settings = self.analysis_settings()
+            cache = self.get_result_cache()
+            digest = None
+            if cache:
+                digest, hit = self.cache_lookup(cache, path, settings)
+                if hit:
+                    if gen is not None and gen != self.load_generation: return
+                    image_pass = self.apply_record(path, *hit)
+                    self.root.after(0, self.update_nav_ui)
+                    self.root.after(0, self.safe_update_ui, path, {'final_result': 'pass' if image_pass else 'fail'})
+                    return
+            
+            if settings['multi_seam']:
+                # Multi-seam: stages 2-4 for every seam of the one decoded frame, no scan animation
+                decoded = prefetcher.get(path) if prefetcher else None
+                prefetch_timing = stop_stage_timing() # analyze_image starts its own timing
+                details = {}
+                record = self.processor.analyze_image(path, settings['fail_thd'], settings['check_distortion'],
+                                                      details=details, multi_seam=True, decoded=decoded)
+                for stage, ms in prefetch_timing.items():
+                    details['timing'][stage] = round(details['timing'].get(stage, 0.0) + ms, 2)
+                if gen is not None and gen != self.load_generation: return
+                image_pass = self.apply_record(path, record, details)
+                self.store_result(path, digest, settings, details['measurements'])
+                if not turbo:
+                    for snap in self.analysis_history[path]['snapshots']:
+                        self.add_preview_thumbnail(snap['img'], snap['index'], snap['status'], snap['shift'], snap['rect'], snap['seam'])
+                self.root.after(0, self.update_nav_ui)
+                self.root.after(0, self.safe_update_ui, path, {'final_result': 'pass' if image_pass else 'fail',
+                                                              'dist_boxes': [(x, y, x + w, y + h) for x, y, w, h in details.get('dist_boxes', [])]})
+                return
+            measurements = {}
+            
+            # Seam-strip-only decode unless the full frame is needed for the distortion scan
+            decoded = prefetcher.get(path) if prefetcher else None
+            result = self.processor.analyze_image_prepare(path, strip_only=not self.check_distortion_var.get(), decoded=decoded)
             if not result:
                 self.log(f"  [NG] 在 {os.path.basename(path)} 中發生嚴重錯誤，無法載入影像。")
                 self.analysis_history[path]['is_pass'] = False
+                self.store_result(path, digest, settings, {'error': "IMAGE_LOAD_ERROR"})
                 return
                 
             cv_img, steps = result
             if not steps:
                 self.log(f"  [NG] 在 {os.path.basename(path)} 中未偵測到任何分析目標 (No targets found).")
                 self.analysis_history[path]['is_pass'] = False
+                self.store_result(path, digest, settings, {'error': "NO_TARGETS"})
                 self.root.after(0, self.safe_update_ui, path, {'final_result': 'fail'})
                 return
 
@@ -1442,6 +1940,7 @@ class SplicingGUI:
             # Collectors for final spec_issue log
             shift_vals = []
             disc_vals = [] # List of tuples: (white, red, green, blue)
+            roi_errors = []
             
             for step in steps:
                 if self.stop_event.is_set(): return
@@ -1451,9 +1950,10 @@ class SplicingGUI:
                 
                 # Animation Start - Yellow Box
                 overlay = {'rect': step.get('viz_rect', step['rect']), 'text': "SCANNING", 'status': 'checking'}
-                # v1.5.9: Pass rect to show FOCUS arrow during scan
-                self.root.after(0, self.safe_update_ui, path, overlay.copy(), step['rect'])
-                time.sleep(0.7) 
+                if not turbo:
+                    # v1.5.9: Pass rect to show FOCUS arrow during scan
+                    self.root.after(0, self.safe_update_ui, path, overlay.copy(), step['rect'])
+                    time.sleep(0.7) 
                 
                 if force_fail is not None:
                     shift, debug_roi, discs = self.processor.process_step(cv_img, step)
@@ -1472,6 +1972,7 @@ class SplicingGUI:
                 
                 shift_vals.append(shift)
                 disc_vals.append(discs)
+                roi_errors.append(force_fail is not None)
                 
                 if not is_pass: 
                     image_pass = False
@@ -1484,27 +1985,29 @@ class SplicingGUI:
                 
                 # Store result for CSV
                 res = [os.path.basename(path), step['index'], shift, 
-                       'PASS' if is_pass else 'FAIL', time.strftime("%H:%M:%S")]
+                       'PASS' if is_pass else 'FAIL', time.strftime("%H:%M:%S"), path]
                 self.results_data.append(res)
                 
                 # Animation Done - Result Box
                 overlay['text'] = status_text
                 overlay['status'] = status_tag
                 # v1.5.9: Maintain arrow visibility on result step
-                self.root.after(0, self.safe_update_ui, path, overlay.copy(), step['rect'])
+                if not turbo:
+                    self.root.after(0, self.safe_update_ui, path, overlay.copy(), step['rect'])
                 
                 fail_msg = "" if is_pass else f" (THRESHOLD {self.fail_thd_var.get()}px)"
                 self.log(f"  Target {step['index']}: {shift} px -> {'PASS' if is_pass else 'FAIL'}{fail_msg}")
                 
                 # Add to Bottom Preview Area (v1.1.8: Horizontal + Arrow)
-                self.add_preview_thumbnail(debug_roi, step['index'], status_tag, shift, step['rect'])
+                if not turbo:
+                    self.add_preview_thumbnail(debug_roi, step['index'], status_tag, shift, step['rect'])
                 
                 # Store snapshot in history for navigation recall
                 self.analysis_history[path]['snapshots'].append({
                     'img': debug_roi.copy(), 'index': step['index'], 'status': status_tag, 'shift': shift, 'rect': step['rect']
                 })
                 
-                time.sleep(1.0) 
+                if not turbo: time.sleep(1.0) 
             
             # --- FINAL SPEC ISSUE LOGGING ---
             cam_id = "cam"
@@ -1525,6 +2028,7 @@ class SplicingGUI:
             
             avg_shift = sum(shift_vals) / len(shift_vals) if shift_vals else 0
             self.log(f"pixel_shift_avg = {avg_shift}")
+            measurements = {'shifts': shift_vals, 'discs': [[float(v) for v in d] for d in disc_vals], 'roi_error': roi_errors}
             
             # --- GLOBAL DISTORTION CHECK ---
             if self.check_distortion_var.get():
@@ -1541,14 +2045,21 @@ class SplicingGUI:
                     'final_result': 'pass' if image_pass and not is_distorted else 'fail',
                     'dist_boxes': dist_steps
                 }
-                self.root.after(0, self.safe_update_ui, path, final_overlay)
+                if not turbo:
+                    self.root.after(0, self.safe_update_ui, path, final_overlay)
 
+                measurements['distortion'] = {'is_distorted': bool(is_distorted), 'max_ecc': float(max_ecc), 'shape_cnt': int(found_cnt)}
                 if is_distorted:
                     self.log(f"  [NG] 偵測到明顯畸變 (最大變形比率: {max_ecc}, 樣本數: {found_cnt})")
                     image_pass = False
                 else:
                     self.log(f"  [OK] 幾何形狀正常 (最大變形比率: {max_ecc}, 樣本數: {found_cnt})")
 
+            timing = stop_stage_timing()
+            if gen is not None and gen != self.load_generation: return
+            self.analysis_history[path]['timing'] = timing
+            self.log_timing(timing)
+            
             self.log("SPEC_PASS" if image_pass else "SPEC_FAIL")
             
             # --- DIAGNOSTIC SUMMARY (v1.1.9) ---
@@ -1567,14 +2078,84 @@ class SplicingGUI:
             if path in self.analysis_history:
                 self.analysis_history[path]['overlay'] = final_overlay.copy()
                 self.analysis_history[path]['is_pass'] = image_pass
+            self.store_result(path, digest, settings, measurements)
             
             self.root.after(0, self.update_nav_ui)
             # Final Giant Overlay - Hide scan arrow
             self.root.after(0, self.hide_target_arrow) 
             self.root.after(0, self.safe_update_ui, path, final_overlay)
-            time.sleep(1.2) 
+            if not turbo: time.sleep(1.2) 
         except Exception as e:
             self.log(f"分析單張照片時發生錯誤: {str(e)}")
+        finally:
+            stop_stage_timing()
+
+    def log_timing(self, timing):
+        """Optional timing: section of the spec_issue block (Settings: Stage Timing)."""
+        if not timing or not self.show_timing_var.get(): return
+        self.log("timing:")
+        for stage in STAGES:
+            if stage in timing:
+                self.log(f"  {stage}_ms={timing[stage]:.1f}")
+        self.log(f"  total_ms={sum(timing.values()):.1f}")
+
+    def store_result(self, path, digest, settings, measurements):
+        """Keep the graded record in analysis_history and write the measurements to the result cache."""
+        record = self.processor.grade_record(self.processor.build_record(path, measurements), settings['fail_thd'])
+        hist = self.analysis_history.get(path)
+        if hist is not None:
+            hist['record'] = record
+        cache = self.get_result_cache()
+        if cache and digest:
+            snapshots = hist.get('snapshots', []) if hist is not None else []
+            try: cache.put(digest, settings, measurements, snapshots)
+            except Exception as e: self.log(f"寫入結果快取失敗: {str(e)}")
+
+    def schedule_regrade(self):
+        """Debounce fail threshold slider moves into one regrade_results call."""
+        if self._regrade_timer:
+            self.root.after_cancel(self._regrade_timer)
+        self._regrade_timer = self.root.after(300, self.regrade_results)
+
+    def regrade_results(self):
+        """
+        Re-apply PASS/FAIL for the current fail threshold from the stored records
+        (no re-analysis): history, thumbnails, CSV rows, bookmark grid and dashboard.
+        """
+        self._regrade_timer = None
+        if self.is_analyzing or not self.analysis_history: return
+        fail_thd = int(self.fail_thd_var.get())
+        t0 = time.perf_counter()
+        
+        by_path = {}
+        regraded = changed = 0
+        for path, hist in self.analysis_history.items():
+            record = hist.get('record')
+            if not record: continue
+            was_pass = hist.get('is_pass')
+            self.processor.grade_record(record, fail_thd)
+            image_pass = record['result'] == "SPEC_PASS"
+            hist['is_pass'] = image_pass
+            hist['overlay'] = {'final_result': 'pass' if image_pass else 'fail'}
+            for snap, target in zip(hist.get('snapshots', []), self.processor.record_targets(record)):
+                snap['status'] = 'pass' if target[2] else 'fail'
+            by_path[path] = record
+            regraded += 1
+            changed += was_pass != image_pass
+        if not regraded: return
+        
+        # CSV rows: [file, target (index or "cam01:0"), shift, status, time, path]; archive
+        # members of different units often share a file name, so rows are matched by path
+        for row in self.results_data:
+            record = by_path.get(row[5])
+            roi_error = {label: err for label, _, _, err in self.processor.record_targets(record)} if record else {}
+            row[3] = 'PASS' if not roi_error.get(row[1], False) and row[2] < fail_thd else 'FAIL'
+        
+        self.update_nav_ui()
+        self.update_dashboard()
+        if self.current_image_path in self.analysis_history:
+            self.display_image(self.current_image_path)
+        self.log(f"已依新門檻 {fail_thd}px 重新判定 {regraded} 張影像 (結果改變 {changed} 張, {(time.perf_counter() - t0) * 1000:.0f} ms)")
 
     def clear_previews(self):
         def _clear():
@@ -1714,7 +2295,7 @@ class SplicingGUI:
             except: pass
         self.global_mag_popups.clear()
 
-    def add_preview_thumbnail(self, cv_img, index, status, shift, rect):
+    def add_preview_thumbnail(self, cv_img, index, status, shift, rect, seam=None):
         def _add():
             try:
                 if len(cv_img.shape) == 3:
@@ -1750,7 +2331,7 @@ class SplicingGUI:
                 info_frame.pack(side=LEFT, padx=10)
                 
                 status_zh = "通過" if status == 'pass' else "不合格"
-                lbl_index = ttk.Label(info_frame, text=f"目標 T{index}", font=("Helvetica", 16, "bold"))
+                lbl_index = ttk.Label(info_frame, text=f"目標 {seam} T{index}" if seam else f"目標 T{index}", font=("Helvetica", 16, "bold"))
                 lbl_index.pack(anchor=W)
                 
                 lbl_shift_x = ttk.Label(info_frame, text=f"位移: {shift}px", font=("Helvetica", 12))
@@ -1875,6 +2456,10 @@ class SplicingGUI:
     def analysis_done(self):
         self.is_analyzing = False
         self.stop_event.set()
+        if self.processor.seam_prior is not None:
+            self.log(f"接縫位置預測 {self.seam_prior.summary()}")
+            try: self.seam_prior.save()
+            except Exception as e: self.log(f"無法儲存 seam_prior.json: {str(e)}")
         self.root.after(0, self.hide_target_arrow)
         self.root.after(0, lambda: self.analyze_btn.config(state=NORMAL))
         self.root.after(0, lambda: self.status_var.set("分析完成"))
@@ -1953,6 +2538,22 @@ class SplicingGUI:
                 lbl.pack()
                 ttk.Label(item, text=f"{count} 次", font=("Helvetica", size - 2)).pack()
 
+        # 4b. Stage timing (p50 / p95 ms per stage over the analysed images)
+        timings = [h['timing'] for h in self.analysis_history.values() if h.get('timing')]
+        if timings:
+            ttk.Label(self.dash_detail_frame, text=f"⏱️ 階段耗時 (Stage Timing, {len(timings)} 張):", 
+                      font=("Helvetica", size + 2, "bold")).pack(anchor=W, pady=(30, 10))
+            timing_box = ttk.Frame(self.dash_detail_frame)
+            timing_box.pack(fill=X)
+            totals = [sum(t.values()) for t in timings]
+            for stage, vals in [(stage, [t[stage] for t in timings if stage in t]) for stage in STAGES] + [("total", totals)]:
+                if not vals: continue
+                item = ttk.Frame(timing_box, padding=5)
+                item.pack(side=LEFT, padx=5)
+                ttk.Label(item, text=stage, font=("Helvetica", size - 2, "bold"), bootstyle=INFO).pack()
+                ttk.Label(item, text=f"p50 {np.percentile(vals, 50):.1f} ms", font=("Helvetica", size - 2)).pack()
+                ttk.Label(item, text=f"p95 {np.percentile(vals, 95):.1f} ms", font=("Helvetica", size - 2)).pack()
+
         # 5. NG Quick-Jump Gallery (Thumbnail list of failures)
         ttk.Label(self.dash_detail_frame, text=f"🚨 不合格清單 ({len(fail_files)}):", 
                   font=("Helvetica", size + 2, "bold")).pack(anchor=W, pady=(30, 10))
@@ -2014,15 +2615,23 @@ class SplicingGUI:
         if save_path:
             import csv
             try:
+                # Per-image stage timing (ms), repeated on each target row of the image
+                timing_by_path = {p: h.get('timing') or {} for p, h in self.analysis_history.items()}
                 with open(save_path, 'w', newline='', encoding='utf-8-sig') as f:
                     writer = csv.writer(f)
-                    writer.writerow(["檔案名稱", "目標索引", "像素偏移 (px)", "狀態", "時間戳記"])
-                    writer.writerows(self.results_data)
+                    writer.writerow(["檔案名稱", "目標索引", "像素偏移 (px)", "狀態", "時間戳記"] +
+                                    [f"{stage}_ms" for stage in STAGES] + ["total_ms"])
+                    for row in self.results_data:
+                        timing = timing_by_path.get(row[5], {})
+                        writer.writerow(list(row[:5]) + [timing.get(stage, "") for stage in STAGES] +
+                                        [round(sum(timing.values()), 2) if timing else ""])
                 self.log(f"結果已儲存至: {os.path.basename(save_path)}")
             except Exception as e:
                 self.log(f"匯出失敗: {str(e)}")
 
 if __name__ == "__main__":
+    # Needed by the distortion worker pool in the frozen (PyInstaller) exe
+    multiprocessing.freeze_support()
     root = ttk.Window(themename="darkly")
     app = SplicingGUI(root)
     root.mainloop()
@@ -0,0 +1,149 @@
+"""
+Parameter sweep for diff_thd / rate_thd / fail threshold tuning.
+
+    python -m param_sweep IMAGE --diff 10:30:2 --rate 0.10,0.18,0.30 --fail 3,4,5 -o sweep.json
+
+Each image is decoded and located (stages 1-2) once; its per-target gray ROIs
+are kept and stage 3 (step_shift) is re-run on them for every (diff_thd,
+rate_thd) pair. Images are spread over a process pool. The result is a
+yield and shift matrix per parameter combination. The distortion scan and
+the discontinuities do not depend on these parameters and are not swept.
+"""
+import argparse
+import json
+import sys
+import time
+import cv2
+import numpy as np
+from concurrent.futures import as_completed
+from splicing_logic import SplicingProcessor, get_process_pool
+from splicing_cli import iter_inputs
+
+def extract_sweep_inputs(processor, filename, data=None):
+    """Stages 1-2 once: [(gray ROI or None, step)] for every target, or None when the image cannot be analysed."""
+    result = processor.analyze_image_prepare(filename, strip_only=True, data=data)
+    if not result or not result[1]:
+        return None
+    image, steps = result
+    h_img, w_img = image.shape[:2]
+    targets = []
+    for step in steps:
+        if step.get('force_fail') is not None:
+            targets.append((None, step))
+            continue
+        x1, y1, x2, y2 = step['rect']
+        roi = image[max(0, y1):min(h_img, y2), max(0, x1):min(w_img, x2)]
+        targets.append((cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY) if roi.size else None, step))
+    return targets
+
+def sweep_targets(processor, targets, diff_values, rate_values):
+    """Shift per (diff, rate, target) -> int array [n_diff, n_rate, n_targets]."""
+    shifts = np.zeros((len(diff_values), len(rate_values), len(targets)), dtype=np.int32)
+    for ri, rate in enumerate(rate_values):
+        processor.rate_thd = rate
+        for di, diff in enumerate(diff_values):
+            for ti, (gray, step) in enumerate(targets):
+                if step.get('force_fail') is not None:
+                    shifts[di, ri, ti] = int(step['force_fail'])
+                elif gray is not None:
+                    shifts[di, ri, ti] = int(processor.step_shift(gray, step, int(diff))[0])
+    return shifts
+
+def sweep_job(filename, diff_values, rate_values, data=None):
+    """Process-pool entry point: decode once, sweep every (diff, rate). Returns (shifts or None, roi_error flags)."""
+    processor = SplicingProcessor()
+    targets = extract_sweep_inputs(processor, filename, data)
+    if targets is None:
+        return None, []
+    roi_error = [step.get('force_fail') is not None for _, step in targets]
+    return sweep_targets(processor, targets, diff_values, rate_values), roi_error
+
+def run_sweep(inputs, diff_values, rate_values, fail_values, workers=1, keyword="", progress=None):
+    """
+    Sweep every image of inputs (files, folders, archives). Returns a dict with
+    per-image shift cubes and, per (diff, rate, fail), the yield (share of images
+    with every target below fail and no ROI error) and mean/max shift.
+    """
+    images = []
+    items = list(iter_inputs(inputs, keyword))
+    if workers > 1:
+        pool = get_process_pool(workers)
+        futures = {pool.submit(sweep_job, path, diff_values, rate_values, data): path for path, _, data in items}
+        for fut in as_completed(futures):
+            images.append((futures[fut], *fut.result()))
+            if progress: progress(len(images), len(items))
+    else:
+        for path, _, data in items:
+            images.append((path, *sweep_job(path, diff_values, rate_values, data)))
+            if progress: progress(len(images), len(items))
+    images.sort(key=lambda x: x[0])
+
+    n_d, n_r, n_f = len(diff_values), len(rate_values), len(fail_values)
+    passed = np.zeros((n_d, n_r, n_f), dtype=np.int64)
+    mean_shift = np.zeros((n_d, n_r))
+    max_shift = np.zeros((n_d, n_r), dtype=np.int64)
+    per_image = []
+    valid = [(s, e) for _, s, e in images if s is not None]
+    for shifts, roi_error in valid:
+        worst = shifts.max(axis=2) # [n_diff, n_rate]
+        ok_roi = not any(roi_error)
+        for fi, fail in enumerate(fail_values):
+            passed[:, :, fi] += (worst < int(fail)) & ok_roi
+        mean_shift += shifts.mean(axis=2)
+        max_shift = np.maximum(max_shift, worst)
+    if valid:
+        mean_shift /= len(valid)
+    for path, shifts, roi_error in images:
+        per_image.append({'file': path, 'shifts': shifts.tolist() if shifts is not None else None, 'roi_error': roi_error})
+
+    total = len(images)
+    return {
+        'diff_values': list(diff_values), 'rate_values': list(rate_values), 'fail_values': list(fail_values),
+        'images': total,
+        'yield': (passed / total).tolist() if total else [],
+        'mean_shift': mean_shift.round(3).tolist(),
+        'max_shift': max_shift.tolist(),
+        'per_image': per_image,
+    }
+
+def parse_values(text, cast=float):
+    """'10:30:2' (start:stop:step, inclusive) or '10,12,18'."""
+    if ':' in text:
+        start, stop, step = (float(v) for v in text.split(':'))
+        return [cast(round(v, 6)) for v in np.arange(start, stop + step / 2, step)]
+    return [cast(v) for v in text.split(',') if v.strip()]
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m param_sweep", description="diff/rate/fail threshold sweep (decode once per image).")
+    ap.add_argument("inputs", nargs="+", help="image files, folders, .zip or .7z archives")
+    ap.add_argument("--diff", default="10:30:2", help="diff_thd values, start:stop:step or comma list")
+    ap.add_argument("--rate", default="0.10,0.14,0.18,0.22,0.26", help="rate_thd values")
+    ap.add_argument("--fail", default="3,4,5", help="fail thresholds in px")
+    ap.add_argument("--workers", type=int, default=1, help="processes (one image per task)")
+    ap.add_argument("--keyword", default="")
+    ap.add_argument("-o", "--output", help="write the full result as JSON")
+    args = ap.parse_args(argv)
+
+    diff_values = parse_values(args.diff, int)
+    rate_values = parse_values(args.rate, float)
+    fail_values = parse_values(args.fail, int)
+
+    t0 = time.perf_counter()
+    result = run_sweep(args.inputs, diff_values, rate_values, fail_values, max(1, args.workers), args.keyword,
+                       progress=lambda k, n: print(f"\r{k}/{n}", end="", file=sys.stderr))
+    print(f"\n{result['images']} images x {len(diff_values) * len(rate_values)} combinations in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+
+    # Yield table per fail threshold (rows diff, columns rate)
+    for fi, fail in enumerate(fail_values):
+        print(f"\nYield % (fail < {fail}px)   rows: diff_thd, cols: rate_thd")
+        print("diff\\rate " + "".join(f"{r:>8.2f}" for r in rate_values))
+        for di, diff in enumerate(diff_values):
+            print(f"{diff:>9} " + "".join(f"{result['yield'][di][ri][fi] * 100:>8.1f}" for ri in range(len(rate_values))))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=1)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
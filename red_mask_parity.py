@@ -0,0 +1,44 @@
+import sys
+import time
+import numpy as np
+from splicing_logic import red_ratio_mask
+
+def pixel_parity():
+    """All uint8 (b, g, r) triples: red_ratio_mask vs the old r_safe float test of Find_Center_ROI."""
+    v = np.arange(256, dtype=np.uint8)
+    b, g, r = (a.ravel() for a in np.meshgrid(v, v, v, indexing='ij'))
+    r_safe = r.astype(float)
+    r_safe[r_safe == 0] = 1.0
+    old = (g / r_safe < 0.75) & (b / r_safe < 0.75)
+    diff = old != red_ratio_mask(b, g, r)
+    # r_safe turned black (0, 0, 0) into "red"; red_ratio_mask never calls r == 0 red.
+    # Rgray = r there, so the masked red channel is 0 either way.
+    black = (r == 0) & (g == 0) & (b == 0)
+    bad = int((diff & ~black).sum())
+    print(f"uint8 pixels: {b.size} triples, {int(diff.sum())} differ (black only: {int((diff & black).sum())}), {bad} mismatches")
+    return bad
+
+def row_sum_parity(n=13):
+    """All (colour sum, red sum) pairs of n-pixel rows: red_ratio_mask vs the old float row means of find_red_indices."""
+    s = np.arange(255 * n + 1, dtype=np.uint32)
+    zero = np.zeros_like(s)
+    mean = s / n
+    bad = 0
+    for name, lit, ratio in (("g/r", 0.75, (3, 4)), ("b/r", 0.70, (7, 10))):
+        for sr in range(1, len(s)):
+            red = np.full_like(s, sr)
+            old = mean / (sr / n) < lit
+            if name == "g/r":
+                new = red_ratio_mask(zero, s, red, gr=ratio, br=(7, 10), n=n)
+            else:
+                new = red_ratio_mask(s, zero, red, gr=(3, 4), br=ratio, n=n)
+            bad += int((old != new).sum())
+        print(f"row sums n={n} {name} < {lit}: {(len(s) - 1) * len(s)} pairs checked")
+    print(f"row sums n={n}: {bad} mismatches")
+    return bad
+
+if __name__ == "__main__":
+    t0 = time.perf_counter()
+    bad = pixel_parity() + row_sum_parity(int(sys.argv[1]) if len(sys.argv) > 1 else 13)
+    print(f"{'PASS' if not bad else 'FAIL'} ({time.perf_counter() - t0:.1f}s)")
+    sys.exit(1 if bad else 0)
@@ -0,0 +1,199 @@
+"""
+Parity check between SplicingProcessor and the 100cm reference script.
+
+    python -m reference_parity IMAGE IMAGE/ZIP/lot1.zip --workers 8 -o parity.csv
+
+Every image is run through both implementations inside the same pool worker:
+the reference script (20251222_1440_TestStation_100cm.py, compiled once per
+worker and executed on a one-image folder with its stdout captured) and
+analyze_image with the script's parameters. The MAX_PixelsShift_i and the
+four *_discontinue_i values the script prints for ATS are compared per
+target; shifts must match exactly, discontinuities within --tol percentage
+points. The script needs its own dependencies (matplotlib, numpy < 2);
+--vectorized runs it in its vectorized mode (same output, several times faster).
+"""
+import argparse
+import contextlib
+import csv
+import io
+import math
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import as_completed
+from splicing_logic import get_process_pool, analyze_image_job
+from splicing_cli import iter_inputs
+from image_source import read_image_bytes
+
+REFERENCE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "20251222_1440_TestStation_100cm.py")
+METRICS = ("MAX_PixelsShift", "Brightness_discontinue", "red_discontinue", "green_discontinue", "blue_discontinue")
+# MAX_PixelsShift_0=3 pixelsMAX_PixelsShift_0_END / red_discontinue_1=2.5%red_discontinue_1_END
+_VALUE_LINE = re.compile(r"^(%s)_(\d+)=(.*?) ?(?:pixels|%%)\1_\2_END$" % "|".join(METRICS))
+
+def parse_reference_output(text):
+    """{(metric, target): float} from the script's stdout (the last value printed wins)."""
+    values = {}
+    for line in text.splitlines():
+        m = _VALUE_LINE.match(line.strip())
+        if m:
+            values[(m.group(1), int(m.group(2)))] = float(m.group(3))
+    return values
+
+def engine_values(record, measurements):
+    """Same keys as parse_reference_output from an analyze_image record (unrounded discontinuities)."""
+    if record.get('error'):
+        # The script's ROI_SELECTOR_ERROR: 100 for every value of three targets
+        return {(metric, i): 100.0 for i in range(3) for metric in METRICS}
+    values = {}
+    for i, (shift, discs) in enumerate(zip(measurements['shifts'], measurements['discs'])):
+        values[("MAX_PixelsShift", i)] = 100.0 if measurements['roi_error'][i] else float(shift)
+        for metric, d in zip(METRICS[1:], discs):
+            values[(metric, i)] = d * 100.0
+    return values
+
+# Per-process compiled reference script (built once per pool worker)
+_reference_code = {}
+
+def run_reference(filename, data, script=REFERENCE_SCRIPT, vectorized=False):
+    """Execute the reference script on one image; returns its captured stdout."""
+    code = _reference_code.get(script)
+    if code is None:
+        with open(script, 'r', encoding='utf-8') as f:
+            code = _reference_code[script] = compile(f.read(), script, 'exec')
+    # The script walks a folder (root + file name); give it one holding only this image
+    folder = tempfile.mkdtemp(prefix="ref_parity_")
+    argv = sys.argv
+    out = io.StringIO()
+    try:
+        with open(os.path.join(folder, "image" + os.path.splitext(filename)[1].lower()), 'wb') as f:
+            f.write(data)
+        sys.argv = [script, folder + os.sep] + (["--vectorized"] if vectorized else [])
+        with contextlib.redirect_stdout(out):
+            exec(code, {'__name__': "__reference__", '__file__': script})
+    finally:
+        sys.argv = argv
+        shutil.rmtree(folder, ignore_errors=True)
+    return out.getvalue()
+
+def compare_values(ref, eng, tol):
+    """[(metric, target, ref, engine)] for every value that differs (missing on one side: None)."""
+    diffs = []
+    for key in sorted(set(ref) | set(eng), key=lambda k: (k[1], METRICS.index(k[0]))):
+        r, e = ref.get(key), eng.get(key)
+        if r is None or e is None:
+            same = False
+        elif math.isnan(r) or math.isnan(e):
+            same = math.isnan(r) and math.isnan(e)
+        else:
+            same = r == e if key[0] == "MAX_PixelsShift" else abs(r - e) <= tol
+        if not same:
+            diffs.append((key[0], key[1], r, e))
+    return diffs
+
+def parity_job(filename, settings, tol, data=None, script=REFERENCE_SCRIPT, vectorized=False):
+    """
+    Process-pool entry point: both implementations on one image.
+    Returns (diffs, ref_error, ref_seconds, engine_seconds). A missing module
+    of the script (ImportError) is raised: no image can be checked then.
+    """
+    if data is None:
+        data = read_image_bytes(filename)
+    ref_error = None
+    t0 = time.perf_counter()
+    try:
+        ref = parse_reference_output(run_reference(filename, data, script, vectorized))
+    except ImportError:
+        raise
+    except Exception as e:
+        ref, ref_error = {}, f"{type(e).__name__}: {e}"
+    t1 = time.perf_counter()
+    record, details = analyze_image_job(filename, settings, data)
+    t2 = time.perf_counter()
+    diffs = [] if ref_error else compare_values(ref, engine_values(record, details['measurements']), tol)
+    return diffs, ref_error, t1 - t0, t2 - t1
+
+def run_parity(inputs, workers=1, tol=0.05, keyword="", script=REFERENCE_SCRIPT, vectorized=False, progress=None):
+    """[(path, diffs, ref_error, ref_s, engine_s)] for every image of inputs, in input order."""
+    # The script's hard-coded parameters (diff_thd=10, Rate < 0.1), no distortion scan
+    settings = {'diff_thd': 10, 'rate_thd': 0.1, 'fail_thd': 4, 'check_distortion': False}
+    items = list(iter_inputs(inputs, keyword))
+    results = {}
+    if workers > 1:
+        pool = get_process_pool(workers)
+        futures = {pool.submit(parity_job, path, settings, tol, data, script, vectorized): path for path, _, data in items}
+        for fut in as_completed(futures):
+            results[futures[fut]] = fut.result()
+            if progress: progress(len(results), len(items))
+    else:
+        for path, _, data in items:
+            results[path] = parity_job(path, settings, tol, data, script, vectorized)
+            if progress: progress(len(results), len(items))
+    return [(path, *results[path]) for path, _, _ in items]
+
+def _fmt(v):
+    return "-" if v is None else f"{v:g}"
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m reference_parity", description="SplicingProcessor vs. 100cm reference script parity report.")
+    ap.add_argument("inputs", nargs="*", help="image files, folders, .zip or .7z archives (default IMAGE/)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes (one image per task)")
+    ap.add_argument("--tol", type=float, default=0.05, help="allowed discontinuity difference in %% points (shifts must be equal)")
+    ap.add_argument("--keyword", default="")
+    ap.add_argument("--script", default=REFERENCE_SCRIPT, help="reference script (default the 100cm script)")
+    ap.add_argument("--vectorized", action="store_true", help="run the script in its vectorized mode (identical output)")
+    ap.add_argument("-o", "--output", help="write every mismatching value as CSV")
+    args = ap.parse_args(argv)
+
+    inputs = args.inputs or [os.path.join(os.path.dirname(os.path.abspath(__file__)), "IMAGE")]
+    t_start = time.perf_counter()
+    try:
+        results = run_parity(inputs, max(1, args.workers), args.tol, args.keyword, args.script, args.vectorized,
+                             progress=lambda k, n: print(f"\r{k}/{n}", end="", file=sys.stderr))
+    except ImportError as e:
+        print(f"\n[ERROR] the reference script cannot run here: {e}", file=sys.stderr)
+        return 2
+    wall = time.perf_counter() - t_start
+    print(file=sys.stderr)
+
+    rows, per_metric, ref_errors = [], Counter(), Counter()
+    matched = 0
+    for path, diffs, ref_error, _, _ in results:
+        name = os.path.basename(path)
+        if ref_error:
+            ref_errors[ref_error] += 1
+            print(f"{name:<40} REFERENCE ERROR  {ref_error}")
+            continue
+        if not diffs:
+            matched += 1
+            continue
+        for metric, target, r, e in diffs:
+            per_metric[metric] += 1
+            rows.append([path, target, metric, r, e, None if r is None or e is None else round(e - r, 4)])
+            print(f"{name:<40} {f'{metric}_{target}':<28} ref {_fmt(r):>10}  engine {_fmt(e):>10}")
+
+    n = len(results)
+    checked = n - sum(ref_errors.values())
+    ref_s = sum(r[3] for r in results)
+    eng_s = sum(r[4] for r in results)
+    print(f"\n{matched}/{checked} images identical (shift exact, discontinuity ±{args.tol:g}%), "
+          f"{checked - matched} with differences, {sum(ref_errors.values())} reference errors")
+    for metric in METRICS:
+        if per_metric[metric]:
+            print(f"  {metric:<24}{per_metric[metric]:>6} values")
+    for message, count in ref_errors.most_common(5):
+        print(f"  reference error x{count}: {message}")
+    print(f"{n} images in {wall:.1f}s ({args.workers} workers); reference {ref_s:.1f}s, engine {eng_s:.1f}s CPU")
+
+    if args.output:
+        with open(args.output, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(["file", "target", "metric", "reference", "engine", "engine_minus_reference"])
+            writer.writerows(rows)
+    return 0 if matched == checked and not ref_errors else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Persistent analysis result cache (SQLite).
+
+Entries are keyed by the SHA-1 of the image file content, the analysis
+parameters that change the measurements (fail_thd is applied afterwards by
+grade_record, so it is not part of the key) and splicing_logic.ENGINE_VERSION.
+Each entry holds the raw measurements (per-target shift, discontinuities,
+ROI-error flags, distortion metrics) and the per-target debug ROIs as PNG,
+so a hit rebuilds the record and the preview snapshots without decoding the JPEG.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import cv2
+import numpy as np
+from splicing_logic import ENGINE_VERSION
+from image_source import ArchiveMember, read_image_bytes
+
+def content_digest(path=None, data=None):
+    """SHA-1 hex digest of the encoded image (file path, ArchiveMember or bytes)."""
+    h = hashlib.sha1()
+    if data is None and isinstance(path, ArchiveMember):
+        data = read_image_bytes(path)
+    if data is not None:
+        h.update(data)
+    else:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+    return h.hexdigest()
+
+def params_key(settings):
+    """Canonical key of the settings that affect the measurements."""
+    key = {'diff_thd': int(settings.get('diff_thd', 18)),
+           'rate_thd': round(float(settings.get('rate_thd', 0.18)), 4),
+           'check_distortion': bool(settings.get('check_distortion', False))}
+    if key['check_distortion']:
+        key['dist_thd'] = round(float(settings.get('dist_thd', 1.12)), 4)
+        key['dist_engine'] = settings.get('dist_engine', "contour")
+    if settings.get('multi_seam'):
+        key['multi_seam'] = True
+    if settings.get('seam_prior'):
+        # The shortcut skips the windows before the expected one (same result unless they hold a marker too)
+        key['seam_prior'] = True
+    return json.dumps(key, sort_keys=True)
+
+class ResultCache:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS results (
+            digest TEXT, params TEXT, engine TEXT, measurements TEXT, created REAL,
+            PRIMARY KEY (digest, params, engine))""")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS snapshots (
+            digest TEXT, params TEXT, engine TEXT, idx INTEGER, target INTEGER, rect TEXT, png BLOB,
+            PRIMARY KEY (digest, params, engine, idx))""")
+        self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, digest, settings):
+        """Return (measurements, snapshots) or None. snapshots: [{'img', 'index', 'rect'}]."""
+        key = (digest, params_key(settings), ENGINE_VERSION)
+        with self.lock:
+            row = self.conn.execute("SELECT measurements FROM results WHERE digest=? AND params=? AND engine=?", key).fetchone()
+            snaps = self.conn.execute("SELECT target, rect, png FROM snapshots WHERE digest=? AND params=? AND engine=? ORDER BY idx", key).fetchall() if row else []
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        snapshots = []
+        for target, rect, png in snaps:
+            img = cv2.imdecode(np.frombuffer(png, dtype=np.uint8), cv2.IMREAD_COLOR)
+            snapshots.append({'img': img, 'index': target, 'rect': tuple(json.loads(rect))})
+        return json.loads(row[0]), snapshots
+
+    def put(self, digest, settings, measurements, snapshots=()):
+        # A failed load may be transient (MemoryError, file still being copied): never make it sticky
+        if measurements.get('error') == "IMAGE_LOAD_ERROR": return
+        key = (digest, params_key(settings), ENGINE_VERSION)
+        rows = []
+        for i, snap in enumerate(snapshots):
+            ok, png = cv2.imencode(".png", snap['img'])
+            if ok:
+                rows.append(key + (i, int(snap['index']), json.dumps([int(v) for v in snap['rect']]), png.tobytes()))
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)", key + (json.dumps(measurements), time.time()))
+            self.conn.execute("DELETE FROM snapshots WHERE digest=? AND params=? AND engine=?", key)
+            self.conn.executemany("INSERT INTO snapshots VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self.conn.commit()
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM results")
+            self.conn.execute("DELETE FROM snapshots")
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,93 @@
+"""
+Per-camera seam location prior (Find_Center_ROI shortcut).
+
+Within a batch the marker of a given camXX seam lands at nearly the same place
+in every frame. SeamPrior remembers, per camera id, the center_4_ROI window the
+marker was found in and its last bounding boxes; SplicingProcessor.locate_targets
+then searches (and, for seam-strip decodes, decodes) only that window cut down to
+the recent boxes plus a margin, and falls back to the full four-window search
+when no marker lies whole inside the cut. Learned entries are saved as JSON so
+the next batch starts warm; hit / miss / cold counts are per session.
+"""
+import json
+import os
+import threading
+
+class SeamPrior:
+    def __init__(self, path=None, recent=8, margin=24):
+        self.path = path
+        self.recent = recent   # boxes kept per camera
+        self.margin = margin   # px added around the recent boxes
+        self.lock = threading.Lock()
+        self.cams = {}         # cam -> {'window': k, 'boxes': [[x, y, w, h], ...]}
+        self.counts = {'hit': 0, 'miss': 0, 'cold': 0}
+        self.sources = {}      # pool worker pid -> its counts (see merge)
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.cams = json.load(f).get('cams', {})
+            except (OSError, ValueError):
+                self.cams = {}
+
+    def expect(self, cam, roi_points):
+        """(window k, narrowed [x1, x2, y1, y2] inside roi_points[k]) for cam, or None."""
+        with self.lock:
+            entry = self.cams.get(cam) if cam else None
+            if not entry or not entry['boxes'] or not 0 <= entry['window'] < len(roi_points):
+                return None
+            k, boxes = entry['window'], entry['boxes']
+            x1 = min(b[0] for b in boxes) - self.margin
+            y1 = min(b[1] for b in boxes) - self.margin
+            x2 = max(b[0] + b[2] for b in boxes) + self.margin
+            y2 = max(b[1] + b[3] for b in boxes) + self.margin
+        wx1, wx2, wy1, wy2 = roi_points[k]
+        x1, x2, y1, y2 = max(x1, wx1), min(x2, wx2), max(y1, wy1), min(y2, wy2)
+        if x2 <= x1 or y2 <= y1: return None
+        return k, (x1, x2, y1, y2)
+
+    def observe(self, cam, outcome, window=None, box=None):
+        """Count one lookup ('hit', 'miss' or 'cold') and learn the marker found (window, box)."""
+        with self.lock:
+            self.counts[outcome] += 1
+            if not cam or box is None: return
+            entry = self.cams.get(cam)
+            if not entry or entry['window'] != window:
+                entry = self.cams[cam] = {'window': window, 'boxes': []}
+            entry['boxes'] = (entry['boxes'] + [[int(v) for v in box]])[-self.recent:]
+
+    def snapshot(self):
+        """Learned entries and counts, e.g. for a pool worker to hand back (see merge)."""
+        with self.lock:
+            return {'cams': {cam: {'window': e['window'], 'boxes': [list(b) for b in e['boxes']]} for cam, e in self.cams.items()},
+                    'counts': dict(self.counts)}
+
+    def merge(self, snapshot, source):
+        """Take over the entries of a worker's snapshot; its counts replace the ones last seen from source."""
+        with self.lock:
+            self.cams.update(snapshot.get('cams', {}))
+            self.sources[source] = dict(snapshot.get('counts', {}))
+
+    def stats(self):
+        """{'hit', 'miss', 'cold', 'total', 'hit_rate'} over this session (own + merged workers)."""
+        with self.lock:
+            counts = dict(self.counts)
+            for c in self.sources.values():
+                for key in counts: counts[key] += c.get(key, 0)
+        counts['total'] = total = counts['hit'] + counts['miss'] + counts['cold']
+        counts['hit_rate'] = round(counts['hit'] / total, 4) if total else None
+        return counts
+
+    def summary(self):
+        s = self.stats()
+        if not s['total']: return "seam prior: no lookups"
+        return f"seam prior: {s['hit']}/{s['total']} hits ({s['hit_rate'] * 100:.0f}%), {s['miss']} miss, {s['cold']} cold"
+
+    def save(self, path=None):
+        path = path or self.path
+        if not path: return
+        with self.lock:
+            body = json.dumps({'version': 1, 'cams': self.cams}, ensure_ascii=False, indent=1)
+        tmp = path + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(body)
+        os.replace(tmp, path)
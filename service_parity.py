@@ -0,0 +1,68 @@
+"""
+Parity check between the analysis service's legacy text and the 100cm reference script.
+
+    python -m service_parity IMAGE IMAGE/ZIP/lot1.zip
+
+Starts splicing_service with its default arguments on a free loopback port,
+GETs /analyze?path=... for every image and parses the legacy
+MAX_PixelsShift_i / *_discontinue_i lines exactly as for the script's stdout
+(reference_parity.parse_reference_output); archive members are POSTed as
+bytes. Shifts must match exactly; the service prints discontinuities rounded
+to 0.1, hence the default --tol 0.1.
+Exit code 0 when every image matches, 1 on a difference, 2 when the script cannot run.
+"""
+import argparse
+import os
+import sys
+import threading
+from urllib.parse import quote
+from urllib.request import Request, urlopen
+from splicing_cli import iter_inputs, make_settings
+from splicing_service import AnalysisService, make_parser, serve
+from image_source import ArchiveMember, read_image_bytes
+from reference_parity import REFERENCE_SCRIPT, run_reference, parse_reference_output, compare_values, _fmt
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m service_parity", description="Analysis service legacy output vs. 100cm reference script.")
+    ap.add_argument("inputs", nargs="*", help="image files, folders, .zip or .7z archives (default IMAGE/)")
+    ap.add_argument("--tol", type=float, default=0.1, help="allowed discontinuity difference in %% points (shifts must be equal)")
+    ap.add_argument("--keyword", default="")
+    ap.add_argument("--script", default=REFERENCE_SCRIPT, help="reference script (default the 100cm script)")
+    args = ap.parse_args(argv)
+
+    inputs = args.inputs or [os.path.join(os.path.dirname(os.path.abspath(__file__)), "IMAGE")]
+    service = AnalysisService(make_settings(make_parser().parse_args([])))
+    server = serve(service, port=0, quiet=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}/analyze"
+    n = matched = 0
+    try:
+        for path, _, _ in iter_inputs(inputs, args.keyword):
+            name = os.path.basename(path)
+            data = read_image_bytes(path)
+            try:
+                ref = parse_reference_output(run_reference(path, data, args.script))
+            except ImportError as e:
+                print(f"[ERROR] the reference script cannot run here: {e}", file=sys.stderr)
+                return 2
+            if isinstance(path, ArchiveMember):
+                req = Request(f"{base}?name={quote(name)}", data=data, headers={'Content-Type': "image/jpeg"})
+            else:
+                req = f"{base}?path={quote(path)}"
+            with urlopen(req) as resp:
+                legacy = parse_reference_output(resp.read().decode('utf-8'))
+            n += 1
+            diffs = compare_values(ref, legacy, args.tol)
+            if not diffs:
+                matched += 1
+            for metric, target, r, e in diffs:
+                print(f"{name:<40} {f'{metric}_{target}':<28} ref {_fmt(r):>10}  service {_fmt(e):>10}")
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
+    print(f"\n{matched}/{n} images identical (shift exact, discontinuity ±{args.tol:g}%)")
+    return 0 if matched == n else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
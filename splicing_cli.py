@@ -0,0 +1,143 @@
+"""
+Headless batch runner for the splicing engine (no tkinter / ttkbootstrap / PIL).
+
+    python -m splicing_cli IMAGE IMAGE/ZIP/lot1.zip --fail 4 --dist -o results.jsonl
+
+Inputs may be image files, folders (top level, like "Load Folder") or ZIP/7z
+archives. One JSON line is written per image with the spec_issue fields of the
+GUI log (MAX_PixelsShift_i, the four discontinuities, pixel_shift_avg,
+distortion and SPEC_PASS/SPEC_FAIL). With --multi-seam every seam of the frame
+is analysed and the record carries one such record per seam in 'seams'.
+--seam-prior FILE locates each seam first where the file's camera had it
+(seam_prior.SeamPrior, learned over the run and saved back to FILE).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from splicing_logic import SplicingProcessor
+from seam_prior import SeamPrior
+from image_source import list_zip_members, read_7z_members
+from result_cache import ResultCache, content_digest
+
+IMAGE_EXTS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+def _match(fname, keyword):
+    fname = os.path.basename(fname).lower()
+    return fname.endswith(IMAGE_EXTS) and (not keyword or keyword.lower() in fname)
+
+def iter_inputs(inputs, keyword=""):
+    """
+    Yield (path, source, data) for every image in inputs. Archive members come
+    as image_source.ArchiveMember refs that the engine decodes from memory;
+    data is kept for callers that pass raw bytes and is always None here.
+    """
+    for item in inputs:
+        ext = os.path.splitext(item)[1].lower()
+        source = os.path.basename(os.path.normpath(item))
+        if os.path.isdir(item):
+            for f in sorted(os.listdir(item)):
+                if _match(f, keyword):
+                    yield os.path.join(item, f), source, None
+        elif ext in ('.zip', '.7z') and os.path.isfile(item):
+            try:
+                yield from _iter_archive(item, ext, source, keyword)
+            except Exception as e:
+                print(f"[WARN] cannot read archive {item}: {e}", file=sys.stderr)
+        elif os.path.isfile(item):
+            yield item, os.path.dirname(os.path.abspath(item)), None
+        else:
+            print(f"[WARN] input not found: {item}", file=sys.stderr)
+
+def _iter_archive(item, ext, source, keyword):
+    lister = list_zip_members if ext == '.zip' else read_7z_members
+    refs, _ = lister(item, lambda name: _match(name, keyword))
+    for ref in refs:
+        yield ref, source, None
+
+def build_parser():
+    ap = argparse.ArgumentParser(prog="python -m splicing_cli", description="Headless 4CAM splicing check (JSON lines output).")
+    ap.add_argument("inputs", nargs="+", help="image files, folders, .zip or .7z archives")
+    add_analysis_args(ap)
+    ap.add_argument("--keyword", default="", help="only images whose file name contains this keyword")
+    ap.add_argument("--cache", help="SQLite result cache file (reused across runs)")
+    ap.add_argument("-o", "--output", help="write JSON lines here instead of stdout")
+    return ap
+
+def add_analysis_args(ap, diff=18.0, rate=0.18):
+    """Analysis parameters shared by the CLI and the analysis service (diff / rate: their defaults)."""
+    ap.add_argument("--diff", type=float, default=diff, help=f"diff threshold (default {diff:g})")
+    ap.add_argument("--rate", type=float, default=rate, help=f"rate threshold (default {rate:g})")
+    ap.add_argument("--fail", type=int, default=4, help="fail threshold in px (default 4)")
+    ap.add_argument("--dist", action="store_true", help="also run the global distortion scan")
+    ap.add_argument("--dist-thd", type=float, default=1.12, help="distortion threshold (default 1.12)")
+    ap.add_argument("--dist-engine", choices=("contour", "components"), default="contour")
+    ap.add_argument("--dist-workers", type=int, default=1, help="processes for the tiled distortion scan")
+    ap.add_argument("--multi-seam", action="store_true", help="analyse every seam found in the frame (record['seams'])")
+    ap.add_argument("--seam-prior", metavar="FILE", help="per-camera seam location prior (JSON, created / updated)")
+
+def make_processor(args):
+    processor = SplicingProcessor()
+    processor.diff_thd = int(args.diff)
+    processor.rate_thd = args.rate
+    processor.dist_thd = args.dist_thd
+    processor.dist_engine = args.dist_engine
+    processor.dist_workers = max(1, args.dist_workers)
+    if args.seam_prior:
+        processor.seam_prior = SeamPrior(args.seam_prior)
+    return processor
+
+def make_settings(args):
+    """Analysis settings as used by analyze_image_job and the result cache."""
+    return {'diff_thd': int(args.diff), 'rate_thd': args.rate, 'dist_thd': args.dist_thd,
+            'dist_engine': args.dist_engine, 'fail_thd': args.fail, 'check_distortion': args.dist,
+            'multi_seam': args.multi_seam, 'seam_prior': args.seam_prior}
+
+def analyze_cached(processor, cache, settings, path, data=None):
+    """analyze_image through the result cache (cache may be None)."""
+    digest = content_digest(path, data) if cache else None
+    hit = cache.get(digest, settings) if cache else None
+    if hit:
+        record = processor.grade_record(processor.build_record(path, hit[0]), settings['fail_thd'])
+        record['cached'] = True
+        return record
+    
+    details = {}
+    record = processor.analyze_image(path, settings['fail_thd'], settings['check_distortion'], data=data, details=details,
+                                     multi_seam=settings.get('multi_seam', False))
+    if cache:
+        cache.put(digest, settings, details['measurements'], details.get('snapshots', []))
+    return record
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    processor = make_processor(args)
+    settings = make_settings(args)
+    cache = ResultCache(args.cache) if args.cache else None
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+
+    total = passed = 0
+    t_start = time.perf_counter()
+    try:
+        for path, source, data in iter_inputs(args.inputs, args.keyword):
+            t0 = time.perf_counter()
+            record = analyze_cached(processor, cache, settings, path, data)
+            record['source'] = source
+            record['elapsed_s'] = round(time.perf_counter() - t0, 3)
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            total += 1
+            passed += record['result'] == "SPEC_PASS"
+    finally:
+        if out is not sys.stdout: out.close()
+        if cache: cache.close()
+        if processor.seam_prior is not None: processor.seam_prior.save()
+
+    print(f"{total} images, {passed} SPEC_PASS, {total - passed} SPEC_FAIL in {time.perf_counter() - t_start:.1f}s", file=sys.stderr)
+    if processor.seam_prior is not None:
+        print(processor.seam_prior.summary(), file=sys.stderr)
+    return 0 if total else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
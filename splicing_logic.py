@@ -1,7 +1,254 @@
 import cv2
 import numpy as np
-from scipy import signal
 import os
+import re
+import threading
+import time
+import functools
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from image_source import ArchiveMember, read_image_bytes
+from seam_prior import SeamPrior
+
+# Bump whenever a change alters analysis results (invalidates ResultCache entries)
+ENGINE_VERSION = "1.5.0-1"
+
+# Optional: libjpeg-turbo lossless crop for seam-strip-only decoding
+try:
+    from turbojpeg import TurboJPEG
+    _turbo_jpeg = TurboJPEG()
+except Exception:
+    _turbo_jpeg = None
+
+# Per-stage timing (see timed_stage): collected per thread while a dict is active.
+# "slides" is analyze_image_prepare net of decode / Find_Center_ROI, i.e. stage 2.
+STAGES = ("decode", "find_center_roi", "slides", "pixel_shift", "discontinuity", "distortion")
+_stage_timing = threading.local()
+
+# Camera pair of the seam in center_4_ROI window k (x = x_30 + 1920*k), as in the file names
+SEAM_CAMS = ("cam30", "cam01", "cam12", "cam23")
+
+def camera_id(filename):
+    """camXX of an image file name ("4cam_cam01_dre_on.jpg" -> "cam01"), or None."""
+    m = re.search(r'cam(\d+)', os.path.basename(filename).lower())
+    return f"cam{m.group(1)}" if m else None
+
+def start_stage_timing():
+    """Start collecting per-stage seconds for the calling thread. Returns the (live) dict."""
+    _stage_timing.timing = {}
+    _stage_timing.stack = []
+    return _stage_timing.timing
+
+def stop_stage_timing():
+    """Stop collecting for the calling thread; returns {stage: ms} (rounded)."""
+    timing = getattr(_stage_timing, 'timing', None) or {}
+    _stage_timing.timing = None
+    return {k: round(v * 1000.0, 2) for k, v in timing.items()}
+
+def add_stage_timing(timing_ms):
+    """Merge {stage: ms} measured elsewhere (e.g. a prefetch thread) into the active dict."""
+    timing = getattr(_stage_timing, 'timing', None)
+    if timing is None or not timing_ms: return
+    for k, v in timing_ms.items():
+        timing[k] = timing.get(k, 0.0) + v / 1000.0
+
+def timed_stage(stage):
+    """
+    Method decorator: adds the call's wall time to the active timing dict of the
+    thread, exclusive of nested timed stages (decode_image -> Find_Center_ROI).
+    Costs two attribute lookups when no timing is active.
+    """
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            timing = getattr(_stage_timing, 'timing', None)
+            if timing is None:
+                return fn(*args, **kwargs)
+            stack = _stage_timing.stack
+            stack.append(0.0)
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - t0
+                nested = stack.pop()
+                timing[stage] = timing.get(stage, 0.0) + elapsed - nested
+                if stack: stack[-1] += elapsed
+        return inner
+    return wrap
+
+# Shared process pool for multi-core work (created lazily, reused across images)
+_process_pool = None
+_process_pool_size = 0
+
+def get_process_pool(workers):
+    global _process_pool, _process_pool_size
+    # A worker that died (e.g. OOM-killed) breaks the executor for good: start a new one
+    if _process_pool is None or _process_pool_size != workers or getattr(_process_pool, '_broken', False):
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False)
+        _process_pool = ProcessPoolExecutor(max_workers=workers)
+        _process_pool_size = workers
+    return _process_pool
+
+def reset_process_pool():
+    """Drop the shared pool after a failed job; the next get_process_pool starts a fresh one."""
+    global _process_pool, _process_pool_size
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False)
+    _process_pool, _process_pool_size = None, 0
+
+def red_ratio_mask(b, g, r, gr=(3, 4), br=(3, 4), n=1):
+    """
+    The scripts' red test g/r < gr[0]/gr[1] and b/r < br[0]/br[1] (0.75 / 0.75,
+    or 3/4 and 7/10 for the slides) as integer multiply-compares (4*g < 3*r, ...)
+    on uint8 pixels or per-row sums of n pixels, without float temporaries.
+    r == 0 is never red. For sums the scripts divided the rounded row means, which
+    can put an exact tie just below the limit; ties are settled the same way.
+    """
+    wide = np.uint16 if r.dtype == np.uint8 else np.int64
+    r = r.astype(wide)
+    mask = None
+    for c, (num, den) in ((g, gr), (b, br)):
+        c = c.astype(wide) * den
+        rn = r * num
+        ok = c < rn
+        if n > 1:
+            tie = (c == rn) & (r > 0)
+            if tie.any():
+                ok[tie] = (c[tie] // den / n) / (r[tie] / n) < num / den
+        mask = ok if mask is None else mask & ok
+    return mask
+
+def contour_distortion_stats(contours):
+    """Per-contour scoring used by check_distortion. Returns (max_ecc, shape_cnt, boxes)."""
+    max_ecc = 1.0
+    shape_cnt = 0
+    analysed_boxes = []
+    
+    for cnt in contours:
+        area = cv2.contourArea(cnt)
+        # Catch very small artifacts that might represent a break (5 pixels)
+        if 5 < area < 1000000:
+            x, y, cw, ch = cv2.boundingRect(cnt)
+            shape_cnt += 1
+            analysed_boxes.append((x, y, cw, ch))
+            
+            if len(cnt) >= 5:
+                try:
+                    # 1. Eccentricity check (Ellipse fitting)
+                    if len(cnt) >= 6:
+                        _, (ma, mi), _ = cv2.fitEllipse(cnt)
+                        if mi > 0:
+                            ecc = ma / mi
+                            if ecc > max_ecc: max_ecc = ecc
+                    
+                    # 2. Stitching Break check (Step detection):
+                    # In a panoramic stitch, a broken line segment will have a 
+                    # bounding box with unusually high Height relative to its Width if it curves/jumps.
+                    if cw > 30: # Only look at significant horizontal features
+                        step_ratio = ch / (cw * 0.05 + 1.0) # Penalty for height in horizontal lines
+                        if step_ratio > max_ecc:
+                            max_ecc = step_ratio
+                            
+                    # 3. Orientation Check: 
+                    # If a long contour (line) is tilted more than it should be
+                    if cw > 30 and ch > 10:
+                        lean = ch / cw
+                        if lean > 0.5: # Suspected vertical warp or break
+                            if lean * 2 > max_ecc: max_ecc = lean * 2
+                except: continue
+    return max_ecc, shape_cnt, analysed_boxes
+
+def component_distortion_stats(binary):
+    """
+    Connected-component version of contour_distortion_stats (dist_engine = "components").
+    Every 8-connected blob is scored at once: ellipse axes come from the eigenvalues of
+    its pixel covariance (second moments) instead of fitEllipse, step ratio and lean
+    from its bounding box. Blobs replace contours, so hole borders are not counted and
+    the area filter uses the pixel count rather than the polygon area.
+    Returns (max_ecc, shape_cnt, boxes).
+    """
+    n, labels, stats, centroids = cv2.connectedComponentsWithStats(binary, connectivity=8, ltype=cv2.CV_32S)
+    area = stats[:, cv2.CC_STAT_AREA]
+    keep = (area > 5) & (area < 1000000)
+    keep[0] = False # background
+    if not keep.any():
+        return 1.0, 0, []
+    
+    # Central second moments per label (pixel centres, +1/12 for the pixel footprint)
+    flat = labels.ravel()
+    idx = np.flatnonzero(flat)
+    lab = flat[idx]
+    ys, xs = np.divmod(idx, binary.shape[1])
+    cnt = np.maximum(area, 1).astype(np.float64)
+    dx = xs - centroids[lab, 0]
+    dy = ys - centroids[lab, 1]
+    sxx = np.bincount(lab, dx * dx, minlength=n) / cnt + 1.0 / 12
+    syy = np.bincount(lab, dy * dy, minlength=n) / cnt + 1.0 / 12
+    sxy = np.bincount(lab, dx * dy, minlength=n) / cnt
+    
+    bw = stats[keep, cv2.CC_STAT_WIDTH].astype(np.float64)
+    bh = stats[keep, cv2.CC_STAT_HEIGHT].astype(np.float64)
+    sxx, syy, sxy = sxx[keep], syy[keep], sxy[keep]
+    
+    # 1. Eccentricity: major/minor axis ratio = sqrt(lambda_max / lambda_min).
+    # Straight 1px runs are skipped, as fitEllipse skips their 2-point contours.
+    half_tr = (sxx + syy) / 2
+    root = np.sqrt(((sxx - syy) / 2) ** 2 + sxy ** 2)
+    ecc = np.sqrt((half_tr + root) / (half_tr - root))
+    ecc = ecc[(bw > 1) & (bh > 1)]
+    
+    # 2. Step ratio and 3. lean, as in the contour path
+    wide = bw > 30
+    step_ratio = bh[wide] / (bw[wide] * 0.05 + 1.0)
+    lean = bh / bw
+    lean = lean[wide & (bh > 10) & (lean > 0.5)] * 2
+    
+    max_ecc = 1.0
+    for vals in (ecc, step_ratio, lean):
+        if len(vals): max_ecc = max(max_ecc, float(vals.max()))
+    boxes = [tuple(b) for b in stats[keep, :4].tolist()]
+    return max_ecc, int(keep.sum()), boxes
+
+def _band_binary(gray_rows, gray_y0, y0, y1):
+    """adaptiveThreshold of image rows [y0, y1) from rows that carry 3 rows of context."""
+    binary = cv2.adaptiveThreshold(gray_rows, 255, cv2.ADAPTIVE_THRESH_MEAN_C,
+                                   cv2.THRESH_BINARY_INV, 7, 1)
+    return binary[y0 - gray_y0:y1 - gray_y0]
+
+def distortion_band_extents(gray_rows, gray_y0, y0, y1):
+    """
+    Tiled distortion scan, pass 1 (worker): 8-connected components of band [y0, y1).
+    Returns per-label global top/bottom rows plus the labels of the first and last
+    band row, so components crossing band borders can be merged by the caller.
+    """
+    binary = _band_binary(gray_rows, gray_y0, y0, y1)
+    n, labels, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8, ltype=cv2.CV_32S)
+    tops = stats[:, cv2.CC_STAT_TOP] + y0
+    bottoms = tops + stats[:, cv2.CC_STAT_HEIGHT] - 1
+    return tops, bottoms, labels[0].copy(), labels[-1].copy()
+
+def distortion_band_job(gray_rows, gray_y0, region_y0, region_y1, own_y0, own_y1, img_h):
+    """
+    Tiled distortion scan, pass 2 (worker): trace rows [region_y0, region_y1) and
+    score the contours of every component whose top row lies in [own_y0, own_y1).
+    The caller sizes the region so those components (and their holes) are whole.
+    """
+    binary = _band_binary(gray_rows, gray_y0, region_y0, region_y1)
+    contours, _ = cv2.findContours(binary, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE, offset=(0, region_y0))
+    if not contours:
+        return 1.0, 0, []
+    n, labels, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8, ltype=cv2.CV_32S)
+    
+    # Every contour point is a foreground pixel of its component (outer border or hole border)
+    first = np.array([c[0, 0] for c in contours])
+    comp = labels[first[:, 1] - region_y0, first[:, 0]]
+    comp_top = stats[comp, cv2.CC_STAT_TOP] + region_y0
+    comp_end = comp_top + stats[comp, cv2.CC_STAT_HEIGHT]
+    # A piece reaching the region bottom may join other pieces below it, so it is not whole
+    owned = (comp_top >= own_y0) & (comp_top < own_y1) & ((comp_end < region_y1) | (region_y1 == img_h))
+    return contour_distortion_stats([contours[i] for i in np.flatnonzero(owned)])
+
 
 class SplicingProcessor:
     def __init__(self):
@@ -27,6 +274,27 @@ class SplicingProcessor:
         self.roi_w = 30
         self.roi_ht = 8
         self.roi_hd = 20 # Restored to 20 as in 100cm.py line 443
+        
+        # Seam-strip-only decode: half width of the column kept around PX,
+        # plus a guard band so chroma upsampling at the crop edge never
+        # reaches the pixels stages 2-4 actually read.
+        self.strip_half_w = 30
+        self.crop_margin = 16
+        
+        # Tiled distortion scan: worker processes (1 = original single-thread path)
+        # and the rows kept between a band's components and its region border
+        self.dist_workers = 1
+        self.dist_margin = 8
+        
+        # Distortion scoring: "contour" (findContours + fitEllipse per contour) or
+        # "components" (connected components + vectorized moment ellipses)
+        self.dist_engine = "contour"
+        
+        # Multi-seam mode: threads running stages 2-4 of the seams of one frame
+        self.seam_workers = 4
+        
+        # Optional seam_prior.SeamPrior: stage 1 first looks where the file's camera had its marker
+        self.seam_prior = None
 
     def ROI_position(self, center, dx, up_dy, down_dy):
         position_lx = max(0, center[0] - dx)
@@ -46,13 +314,13 @@ class SplicingProcessor:
             roi_points.append(pos)
         return roi_points, Dx
 
+    @timed_stage("find_center_roi")
     def Find_Center_ROI(self, image, roi_points):
         thd = 120
         found_targets = []
         h_img, w_img = image.shape[:2]
         
-        for i in range(4):
-            x1, x2, y1, y2 = roi_points[i]
+        for x1, x2, y1, y2 in roi_points:
             x1, x2 = max(0, int(x1)), min(w_img, int(x2))
             y1, y2 = max(0, int(y1)), min(h_img, int(y2))
             
@@ -64,10 +332,8 @@ class SplicingProcessor:
             
             # Red filtering logic (VEC)
             b, g, r = cv2.split(ROI_image)
-            r_safe = r.astype(float)
-            r_safe[r_safe == 0] = 1.0 
             # Correct logic from original script: rate_gr < 0.75 and rate_br < 0.75
-            mask = (g / r_safe < 0.75) & (b / r_safe < 0.75)
+            mask = red_ratio_mask(b, g, r)
             ROI_image_Rgray[mask] = r[mask]
 
             # BLACK line just like in original script
@@ -81,79 +347,278 @@ class SplicingProcessor:
                 x, y, cw, ch = cv2.boundingRect(cnt)
                 if cw > self.limit_w1 and ch > self.limit_H1 and ch < self.limit_H2:
                     pos_x = (x - 3) + x1 + int(cw/2)
+                    box = (x - 3 + x1, y + y1, cw, ch) # Bounding rect in image coordinates
                     if pos_x <= 1050:
-                        found_targets.append({'x': self.x_30, 'y': y + y1, 'h': ch})
+                        found_targets.append({'x': self.x_30, 'y': y + y1, 'h': ch, 'box': box})
                     elif pos_x <= 3050:
-                        found_targets.append({'x': self.x_30 + 1920, 'y': y + y1, 'h': ch})
+                        found_targets.append({'x': self.x_30 + 1920, 'y': y + y1, 'h': ch, 'box': box})
                     elif pos_x <= 5050:
-                        found_targets.append({'x': self.x_30 + 1920*2, 'y': y + y1, 'h': ch})
+                        found_targets.append({'x': self.x_30 + 1920*2, 'y': y + y1, 'h': ch, 'box': box})
                     elif pos_x <= 7050:
-                        found_targets.append({'x': self.x_30 + 1920*3, 'y': y + y1, 'h': ch})
+                        found_targets.append({'x': self.x_30 + 1920*3, 'y': y + y1, 'h': ch, 'box': box})
                     break 
         return found_targets
 
+    def locate_targets(self, image, cam=None, decode=None):
+        """
+        Stage 1: Find_Center_ROI over the four center windows. With a seam_prior
+        that knows camera cam, only the part of its window around the recent
+        markers is searched first; the shortcut counts as a hit when a marker lies
+        whole inside that cut (so it is the contour the full window gives), else
+        the full search runs. decode(x1, y1, x2, y2) materialises a region first
+        (seam-strip decode). Returns the targets.
+        """
+        h_img, w_img = image.shape[:2]
+        roi_points, Dx = self.center_4_ROI(w_img)
+        clamp = lambda x1, x2, y1, y2: (max(0, int(x1)), min(w_img, int(x2)), max(0, int(y1)), min(h_img, int(y2)))
+        prior = self.seam_prior
+        expected = prior.expect(cam, roi_points) if prior is not None else None
+        if expected:
+            k, rect = expected
+            x1, x2, y1, y2 = clamp(*rect)
+            wx1, wx2, wy1, wy2 = clamp(*roi_points[k])
+            if decode: decode(x1, y1, x2, y2)
+            targets = self.Find_Center_ROI(image, [(x1, x2, y1, y2)])
+            if targets:
+                bx, by, bw, bh = targets[0]['box']
+                # A side may touch the cut only where the cut is the window border
+                if (bx > x1 or x1 == wx1) and (by > y1 or y1 == wy1) and \
+                        (bx + bw < x2 or x2 == wx2) and (by + bh < y2 or y2 == wy2):
+                    prior.observe(cam, 'hit', k, targets[0]['box'])
+                    return targets
+        
+        if decode:
+            for x1, x2, y1, y2 in roi_points:
+                decode(x1, y1, x2, y2)
+        targets = self.Find_Center_ROI(image, roi_points)
+        if prior is not None:
+            found = None
+            if targets:
+                bx, by, bw, bh = targets[0]['box']
+                cx, cy = bx + bw / 2, by + bh / 2
+                found = next((k for k, (x1, x2, y1, y2) in enumerate(roi_points) if x1 <= cx < x2 and y1 <= cy < y2), None)
+            prior.observe(cam, 'miss' if expected else 'cold', found, targets[0]['box'] if found is not None else None)
+        return targets
+
     def Pixel_Shift_analysis(self, ROI_gray, diff_thd, center_line):
+        return self.Pixel_Shift_analysis_batch(ROI_gray, diff_thd, [center_line])[0]
+
+    def _find_valleys_2d(self, x, height=1.0):
+        """
+        Row-wise scipy.signal.find_peaks(x[r], height) as a boolean (rows, n) mask.
+        Same plateau rule as SciPy: a flat top is one peak at its midpoint,
+        and plateaus touching the last sample are not peaks.
+        """
+        rows, n = x.shape
+        peaks = np.zeros((rows, n), dtype=bool)
+        if n < 3: return peaks
+        i_max = n - 1
+        
+        # Index of the next sample whose value differs (the end of a plateau)
+        nxt = np.full((rows, n), i_max, dtype=np.int64)
+        cols = np.broadcast_to(np.arange(1, n), (rows, n - 1))
+        change = np.where(x[:, 1:] != x[:, :-1], cols, i_max)
+        nxt[:, :-1] = np.minimum.accumulate(change[:, ::-1], axis=1)[:, ::-1]
+        i_ahead = np.minimum(nxt, i_max)
+        
+        r_idx = np.arange(rows)[:, None]
+        i = np.arange(1, i_max)
+        ahead = i_ahead[:, 1:i_max]
+        rising = x[:, :i_max-1] < x[:, 1:i_max]
+        falling = x[r_idx, ahead] < x[:, 1:i_max]
+        rr, cc = np.nonzero(rising & falling)
+        mid = (i[cc] + ahead[rr, cc] - 1) // 2
+        keep = x[rr, mid] >= height
+        peaks[rr[keep], mid[keep]] = True
+        return peaks
+
+    def Pixel_Shift_analysis_batch(self, ROI_gray, diff_thd, center_lines):
+        """
+        Pixel_Shift_analysis for several center lines in one pass.
+        Builds the 2 column-band profiles per line (CL-6:CL-1 and CL+1:CL+6,
+        same slice semantics as 100cm.py) as one (2*n, h) array, then does the
+        diff, threshold, valley picking and two-peak rate test row-wise.
+        Returns [(valleys_L, valleys_R, ps), ...] in center_lines order.
+        """
         h, w = ROI_gray.shape[:2]
-        CL = int(center_line)
-        # Use exact slice as 100cm.py
-        Y_L = [np.mean(ROI_gray[i, (CL-6):(CL-1)]) for i in range(h)]
-        Y_R = [np.mean(ROI_gray[i, (CL+1):(CL+6)]) for i in range(h)]
-        
-        Y_L_diff = np.array([(Y_L[i+1] - Y_L[i]) for i in range(h-1)])
-        Y_R_diff = np.array([(Y_R[i+1] - Y_R[i]) for i in range(h-1)])
-        
-        for i in range(len(Y_L_diff)):
-            if Y_L_diff[i] >= -diff_thd: Y_L_diff[i] = 0
-        for i in range(len(Y_R_diff)):
-            if Y_R_diff[i] >= -diff_thd: Y_R_diff[i] = 0
-        
-        valleys_L, _ = signal.find_peaks(-Y_L_diff, 1.0)
-        valleys_R, _ = signal.find_peaks(-Y_R_diff, 1.0)
-        
-        def peak_valleys_zero(value):
-            if len(value) == 0: return np.array([0])
-            return value
-
-        L_pixelsShift = [0]
-        R_pixelsShift = [0]
-        
-        nl = len(valleys_L)
-        if nl > 1:
-            Y_L_diff_list = [Y_L_diff[v] for v in valleys_L]
-            Y_L_list = sorted(Y_L_diff_list)
-            rate_l = abs((Y_L_list[0] - Y_L_list[1]) / Y_L_list[0])
-            if rate_l < self.rate_thd:
-                L_pixelsShift.append(abs(int(valleys_L[0]) - int(valleys_L[1])))
-            else:
-                minl = np.argmin(Y_L_diff_list)
-                valleys_L = np.array([valleys_L[minl]])
-        
-        nr = len(valleys_R)
-        if nr > 1:
-            Y_R_diff_list = [Y_R_diff[v] for v in valleys_R]
-            Y_R_list = sorted(Y_R_diff_list)
-            rate_r = abs((Y_R_list[0] - Y_R_list[1]) / Y_R_list[0])
-            if rate_r < self.rate_thd:
-                R_pixelsShift.append(abs(int(valleys_R[0]) - int(valleys_R[1])))
-            else:
-                minr = np.argmin(Y_R_diff_list)
-                valleys_R = np.array([valleys_R[minr]])
+        starts, stops = [], []
+        for cl in center_lines:
+            CL = int(cl)
+            for a, b in ((CL-6, CL-1), (CL+1, CL+6)):
+                start, stop, _ = slice(a, b).indices(w)
+                starts.append(start)
+                stops.append(max(start, stop))
+        starts, stops = np.array(starts), np.array(stops)
+        
+        # Band means via a row-wise prefix sum (integer sums, exact like np.mean)
+        csum = np.zeros((h, w + 1), dtype=np.int64)
+        np.cumsum(ROI_gray, axis=1, dtype=np.int64, out=csum[:, 1:])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            Y = (csum[:, stops] - csum[:, starts]).T / (stops - starts)[:, None]
+        
+        Y_diff = np.diff(Y, axis=1)
+        Y_diff = np.where(Y_diff >= -diff_thd, 0.0, Y_diff)
+        
+        peaks = self._find_valleys_2d(-Y_diff, 1.0)
+        n_peaks = peaks.sum(axis=1)
+        
+        # Two deepest valleys per row and the first two valley positions
+        vals = np.where(peaks, Y_diff, np.inf)
+        if vals.shape[1] >= 2:
+            low2 = np.partition(vals, 1, axis=1)
+        else:
+            low2 = np.full((len(vals), 2), np.inf)
+        first2 = np.argsort(~peaks, axis=1, kind='stable')[:, :2]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rate = np.abs((low2[:, 0] - low2[:, 1]) / low2[:, 0])
+        multi = n_peaks > 1
+        two_peak = multi & (rate < self.rate_thd)
+        deepest = multi & ~two_peak
+        
+        results = []
+        for k in range(len(center_lines)):
+            out = []
+            shift = 0
+            for r in (2*k, 2*k + 1):
+                if two_peak[r]:
+                    shift = max(shift, abs(int(first2[r, 0]) - int(first2[r, 1])))
+                if deepest[r]:
+                    out.append(np.array([np.argmin(vals[r])]))
+                elif n_peaks[r] == 0:
+                    out.append(np.array([0]))
+                else:
+                    out.append(np.flatnonzero(peaks[r]))
+            results.append((out[0], out[1], shift))
+        return results
 
-        final_ps = max(max(L_pixelsShift), max(R_pixelsShift))
-        return peak_valleys_zero(valleys_L), peak_valleys_zero(valleys_R), final_ps
+    # --- Stage 2: colour-zone search (whole-array, exact to the row-loop version) ---
+    def get_slides(self, roi, wx):
+        """Per-row [b, g, r] sums of the left/right wx columns of the slide strip, and the column count."""
+        # The scripts compare row means; sums over the same n columns give the same decisions in integers
+        sum_L = roi[:, :wx].sum(axis=1, dtype=np.uint32)
+        sum_R = roi[:, -wx:].sum(axis=1, dtype=np.uint32)
+        return sum_L, sum_R, roi[:, :wx].shape[1]
 
-    def analyze_image_prepare(self, filename):
+    def find_red_indices(self, sum_col, ref_col=None, thd=120, n=1, y0=0):
+        """
+        Row indices of the red zones from get_slides sums of n columns whose first
+        row is image row y0; ref_col supplies the colour ratios (100cm.py bug).
+        """
+        # Replicate 100cm.py bug: if ref_col is provided, use its color ratio for filtering
+        # Line 190 & 194 in 100cm.py both use rate_gr_R and rate_br_R
+        if ref_col is None: ref_col = sum_col
+        # Exact logic from original script: rate_gr_R < 0.75 and rate_br_R < 0.70, mean R > thd
+        mask = red_ratio_mask(ref_col[:, 0], ref_col[:, 1], ref_col[:, 2], br=(7, 10), n=n) & (sum_col[:, 2] > thd * n)
+        rows = np.arange(y0, y0 + len(sum_col))
+        mask &= (rows > 400) & (rows < 2650)
+        return np.flatnonzero(mask) + y0
+
+    def get_pyh(self, rgb_list, hlimit=750):
+        """Start row (py) and row count (h) of each red zone separated by > hlimit rows."""
+        rgb_list = np.asarray(rgb_list, dtype=np.int64)
+        if len(rgb_list) == 0: return [], []
+        steps = np.diff(rgb_list)
+        contiguous = np.flatnonzero(steps == 1)
+        if len(contiguous) == 0: return [int(rgb_list[0])], [0]
+        
+        nums = np.flatnonzero(steps > hlimit) + 1
+        py = [int(rgb_list[contiguous[0]])] + rgb_list[nums].tolist()
+        h = np.diff(np.concatenate(([0], nums, [len(rgb_list)]))).tolist()
+        return py, h
+
+    def _crop_decode_into(self, data, canvas, x1, y1, x2, y2):
+        """Decode only [y1:y2, x1:x2] (plus margin) of a JPEG into canvas."""
+        h_img, w_img = canvas.shape[:2]
+        m = self.crop_margin
+        # Align the origin to the 16px MCU grid so the crop starts exactly there
+        cx1 = (max(0, int(x1) - m) // 16) * 16
+        cy1 = (max(0, int(y1) - m) // 16) * 16
+        cx2 = min(w_img, int(x2) + m)
+        cy2 = min(h_img, int(y2) + m)
+        if cx2 <= cx1 or cy2 <= cy1: return
+        part = _turbo_jpeg.decode(_turbo_jpeg.crop(data, cx1, cy1, cx2 - cx1, cy2 - cy1))
+        ph, pw = min(part.shape[0], h_img - cy1), min(part.shape[1], w_img - cx1)
+        canvas[cy1:cy1+ph, cx1:cx1+pw] = part[:ph, :pw]
+
+    def decode_seam_regions(self, data, all_seams=False, cam=None):
+        """
+        Seam-strip-only decode (two-pass "locate then crop-decode").
+        Returns a full-size, mostly untouched zero canvas where only the
+        four center_4_ROI windows and the column strip around PX are decoded,
+        so all downstream coordinates stay identical to a full decode.
+        all_seams: decode the strip of every located seam, not only the first.
+        cam: camera id for the seam_prior (pass 1 then decodes only the expected
+        marker region when the prior holds, see locate_targets).
+        Returns (canvas, targets) or None when crop decoding is unavailable.
+        """
+        if _turbo_jpeg is None: return None
         try:
-            data = np.fromfile(filename, dtype=np.uint8)
-            image = cv2.imdecode(data, cv2.IMREAD_COLOR)
+            header = _turbo_jpeg.decode_header(data)
+            w, h = int(header[0]), int(header[1])
+            # np.zeros pages are only committed when written, so RSS follows the decoded area
+            canvas = np.zeros((h, w, 3), dtype=np.uint8)
+            
+            # Pass 1: locate the seam from the four center windows (or the prior's cut of one)
+            decode = lambda x1, y1, x2, y2: self._crop_decode_into(data, canvas, x1, y1, x2, y2)
+            if all_seams:
+                roi_points, Dx = self.center_4_ROI(w)
+                for x1, x2, y1, y2 in roi_points:
+                    decode(x1, y1, x2, y2)
+                targets = self.Find_Center_ROI(canvas, roi_points)
+            else:
+                targets = self.locate_targets(canvas, cam, decode)
+            
+            # Pass 2: full-height column strip around the detected seam(s)
+            for PX in sorted({t['x'] for t in (targets if all_seams else targets[:1])}):
+                self._crop_decode_into(data, canvas, PX - self.strip_half_w, 0, PX + self.strip_half_w, h)
+            return canvas, targets
+        except Exception:
+            return None
+
+    @timed_stage("decode")
+    def decode_image(self, filename, strip_only=False, data=None, all_seams=False):
+        """
+        Stage 0 of analyze_image_prepare: read + decode. Returns (image, targets)
+        where targets is already located for the seam-strip path and None
+        otherwise, or None when the file cannot be read/decoded.
+        all_seams: the seam strip is decoded for every seam (multi-seam mode).
+        """
+        image, targets = None, None
+        try:
+            if data is None and isinstance(filename, ArchiveMember):
+                data = read_image_bytes(filename)
+            if data is None:
+                data = np.fromfile(filename, dtype=np.uint8)
+            else:
+                data = np.frombuffer(data, dtype=np.uint8)
+            decoded = self.decode_seam_regions(data, all_seams, camera_id(filename)) if strip_only else None
+            if decoded is not None:
+                image, targets = decoded
+            else:
+                image = cv2.imdecode(data, cv2.IMREAD_COLOR)
         except Exception:
             image = None
+        return (image, targets) if image is not None else None
+
+    @timed_stage("slides")
+    def analyze_image_prepare(self, filename, strip_only=False, data=None, decoded=None):
+        """
+        Stages 1-2: decode, locate the seam and build per-target steps.
+        strip_only=True materialises only the regions stages 1-4 read
+        (see decode_seam_regions); the returned image is then NOT suitable
+        for check_distortion or display. Falls back to a full decode when
+        libjpeg-turbo is not available.
+        data: already-read encoded bytes (e.g. an archive member); filename is then only a label.
+        decoded: result of decode_image done ahead of time (see DecodePrefetcher).
+        """
+        if decoded is None:
+            decoded = self.decode_image(filename, strip_only, data)
+        image, targets = decoded if decoded else (None, None)
             
         if image is None: return None
         
-        h, w = image.shape[:2]
-        roi_points, Dx = self.center_4_ROI(w)
-        targets = self.Find_Center_ROI(image, roi_points)
+        if targets is None:
+            targets = self.locate_targets(image, camera_id(filename))
         
         if not targets:
             # Replicate 100cm.py Line 467: ROI_SELECTOR_ERROR
@@ -169,77 +634,55 @@ class SplicingProcessor:
                 })
             return image, final_steps
             
-        target = targets[0]
+        steps = self.seam_steps(image, targets[0])
+        return (image, steps) if steps is not None else None
+
+    def locate_seams(self, filename, strip_only=False, data=None, decoded=None):
+        """
+        Stage 1 of multi-seam mode: one decode (with the strip of every seam when
+        strip_only) and every seam Find_Center_ROI finds, one target per seam x in
+        window order. Returns (image, targets) or None when the image cannot be decoded.
+        """
+        if decoded is None:
+            decoded = self.decode_image(filename, strip_only, data, all_seams=True)
+        if not decoded: return None
+        image, targets = decoded
+        if targets is None:
+            roi_points, Dx = self.center_4_ROI(image.shape[1])
+            targets = self.Find_Center_ROI(image, roi_points)
+        seams = []
+        for t in targets:
+            if all(t['x'] != s['x'] for s in seams):
+                seams.append(t)
+        return image, seams
+
+    def seam_cam(self, x):
+        """Camera pair (cam01, cam12, ...) of the seam at column x."""
+        k = (int(x) - self.x_30) // 1920
+        return SEAM_CAMS[k] if 0 <= k < len(SEAM_CAMS) else "cam"
+
+    @timed_stage("slides")
+    def seam_steps(self, image, target):
+        """Stage 2 for one located seam: the per-target steps, or None when no colour zone is found."""
+        h, w = image.shape[:2]
         PX, PY = target['x'], target['y']
         
         delt_x, dshift = 20, 7
         image_slide_roi = image[:, max(0, PX-delt_x):min(w, PX+delt_x)]
         Wx = delt_x - dshift
         
-        # Slower but exact slide logic from original script
-        def get_slides(roi, wx):
-            h_roi, w_roi = roi.shape[:2]
-            ave_L = np.zeros((h_roi, 3), dtype=np.float64)
-            ave_R = np.zeros((h_roi, 3), dtype=np.float64)
-            for j in range(h_roi):
-                row_l = roi[j, :wx]
-                row_r = roi[j, -wx:]
-                ave_L[j] = np.mean(row_l, axis=0) # [b, g, r]
-                ave_R[j] = np.mean(row_r, axis=0)
-            return ave_L, ave_R
-
-        ave_L, ave_R = get_slides(image_slide_roi, Wx)
-        
-        def find_red_indices(ave_col, ref_col=None):
-            indices = []
-            thd = 120
-            # Replicate 100cm.py bug: if ref_col is provided, use its color ratio for filtering
-            # Line 190 & 194 in 100cm.py both use rate_gr_R and rate_br_R
-            for j in range(len(ave_col)):
-                b, g, r = ave_col[j]
-                rb, rg, rr = ref_col[j] if ref_col is not None else (b, g, r)
-                
-                if rr <= 0: continue
-                # Exact logic from original script: rate_gr_R < 0.75 and rate_br_R < 0.70
-                if (rg/rr < 0.75) and (rb/rr < 0.70):
-                    if r > thd and 400 < j < 2650:
-                        indices.append(j)
-            return indices
-
-        L_R_list = find_red_indices(ave_L, ave_R) # Replicate bug: use ave_R for filtering L
-        R_R_list = find_red_indices(ave_R, ave_R)
-        
-        if not L_R_list or not R_R_list: 
+        # find_red_indices keeps rows 400 < y < 2650 only: sum just those of the 3840
+        y0, y1 = 401, 2650
+        sum_L, sum_R, n = self.get_slides(image_slide_roi[y0:y1], Wx)
+
+        L_R_list = self.find_red_indices(sum_L, sum_R, n=n, y0=y0) # Replicate bug: use ave_R for filtering L
+        R_R_list = self.find_red_indices(sum_R, sum_R, n=n, y0=y0)
+        
+        if len(L_R_list) == 0 or len(R_R_list) == 0: 
             return None
         
-        def get_pyh(rgb_list, hlimit=750):
-            if not rgb_list: return [], []
-            py, h = [], []
-            list0 = []
-            for i in range(len(rgb_list)-1):
-                if rgb_list[i+1] - rgb_list[i] == 1:
-                    list0.append(rgb_list[i])
-            if not list0: return [rgb_list[0]], [0]
-            
-            py.append(list0[0])
-            nums = []
-            for i in range(len(rgb_list)-1):
-                if rgb_list[i+1] - rgb_list[i] > hlimit:
-                    nums.append(i+1)
-                    py.append(rgb_list[i+1])
-            
-            total = len(rgb_list)
-            if not nums:
-                h = [total]
-            else:
-                nums.append(total)
-                h.append(nums[0])
-                for i in range(1, len(nums)):
-                    h.append(nums[i] - nums[i-1])
-            return py, h
-
-        L_R_Py, L_R_H = get_pyh(L_R_list)
-        R_R_Py, R_R_H = get_pyh(R_R_list)
+        L_R_Py, L_R_H = self.get_pyh(L_R_list)
+        R_R_Py, R_R_H = self.get_pyh(R_R_list)
         
         # Handle case where L_R_Py or R_R_Py is too short
         num_targets = min(len(L_R_Py), len(R_R_Py), 3) 
@@ -254,7 +697,7 @@ class SplicingProcessor:
                     'force_fail': 100.0,
                     'msg': "ROI ERROR"
                 })
-            return image, final_steps
+            return final_steps
 
         final_steps = []
         for i in range(num_targets):
@@ -280,20 +723,19 @@ class SplicingProcessor:
                 'calibration': calibration
             })
             
-        return image, final_steps
+        return final_steps
 
     def find_top10(self, arr):
         if len(arr) == 0: return np.zeros(10)
-        # Use simple sort to avoid argsort complexity for small arrays
-        return np.sort(arr)[-10:][::-1]
+        # Partial selection of the 10 largest, then order only those (same values/order as a full sort)
+        if len(arr) > 10:
+            arr = np.partition(arr, len(arr) - 10)[-10:]
+        return np.sort(arr)[::-1]
 
+    @timed_stage("discontinuity")
     def analyze_discontinuity(self, image, delta_h):
         try:
             h_orig, w_orig = image.shape[:2]
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            # 100cm.py Line 210
-            gray_crop = gray[5:, :]
-            
             dy_u, dy_d = 15, 3
             Tdelt_h = 4 * delta_h
             # ROI_imagecolor=image[dy_u:Tdelt_h-dy_d,:] 
@@ -301,33 +743,19 @@ class SplicingProcessor:
             h_color, w_color = roi_color.shape[:2]
             
             Wx, dx_gap = int(w_color/2), 5
+            x_L, x_R = max(1, Wx-dx_gap), min(w_color-1, Wx+dx_gap)
+            
+            # 100cm.py Line 210
+            gray_crop = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)[5:, :]
             
-            def get_means(img_slice, channel):
-                res = []
-                for i in range(img_slice.shape[0]):
-                    res.append(np.mean(img_slice[i, :, channel]))
-                return np.array(res)
-
-            # Left/Right slices
-            slice_L = roi_color[:, :max(1, Wx-dx_gap)]
-            slice_R = roi_color[:, min(w_color-1, Wx+dx_gap):]
-            
-            # B=0, G=1, R=2
-            cB_L = get_means(slice_L, 0)
-            cB_R = get_means(slice_R, 0)
-            cG_L = get_means(slice_L, 1)
-            cG_R = get_means(slice_R, 1)
-            cR_L = get_means(slice_L, 2)
-            cR_R = get_means(slice_R, 2)
-            
-            # Gray averages (Line 238)
-            slice_gray_L = gray_crop[:, :max(1, Wx-dx_gap)]
-            slice_gray_R = gray_crop[:, min(w_color-1, Wx+dx_gap):]
-            white_L_list = []
-            white_R_list = []
-            for i in range(slice_gray_L.shape[0]):
-                white_L_list.append(np.mean(slice_gray_L[i, :]))
-                white_R_list.append(np.mean(slice_gray_R[i, :]))
+            # One reduction per slice: row means of all B/G/R channels (B=0, G=1, R=2) and of gray
+            bgr_L = roi_color[:, :x_L].mean(axis=1)
+            bgr_R = roi_color[:, x_R:].mean(axis=1)
+            white_L = gray_crop[:, :x_L].mean(axis=1)
+            white_R = gray_crop[:, x_R:].mean(axis=1)
+            
+            cB_L, cG_L, cR_L = bgr_L[:, 0], bgr_L[:, 1], bgr_L[:, 2]
+            cB_R, cG_R, cR_R = bgr_R[:, 0], bgr_R[:, 1], bgr_R[:, 2]
             
             # Filtering (Line 230)
             cB_L = cB_L[cB_L <= 128]
@@ -340,7 +768,7 @@ class SplicingProcessor:
             blue_l_val, blue_r_val = safe_mean_top10(cB_L), safe_mean_top10(cB_R)
             green_l_val, green_r_val = safe_mean_top10(cG_L), safe_mean_top10(cG_R)
             red_l_val, red_r_val = safe_mean_top10(cR_L), safe_mean_top10(cR_R)
-            white_l_val, white_r_val = safe_mean_top10(np.array(white_L_list)), safe_mean_top10(np.array(white_R_list))
+            white_l_val, white_r_val = safe_mean_top10(white_L), safe_mean_top10(white_R)
             
             def calc_disc(l, r):
                 denom = (l + r) / 2
@@ -356,11 +784,197 @@ class SplicingProcessor:
         except Exception:
             return 1.0, 1.0, 1.0, 1.0
 
+    def analyze_image(self, filename, fail_thd=4, check_distortion=False, data=None, details=None,
+                      multi_seam=False, decoded=None):
+        """
+        Headless version of the GUI analysis of one image: stages 1-4 for every
+        target plus the optional distortion scan, returned as a spec_issue
+        record (dict). Grading against fail_thd is done by grade_record.
+        details: optional dict that receives the per-target debug ROIs
+        ('snapshots'), the distortion boxes ('dist_boxes') and the raw
+        'measurements' the record was built from (see build_record) and the
+        per-stage 'timing' in ms.
+        multi_seam: stages 2-4 for every seam of the frame (see measure_seams).
+        decoded: decode_image result done ahead of time (all_seams=True for multi_seam).
+        """
+        if details is not None:
+            start_stage_timing()
+        measurements = {}
+        snapshots = details.setdefault('snapshots', []) if details is not None else None
+        if multi_seam:
+            cv_img = self.measure_seams(filename, not check_distortion, data, decoded, measurements, snapshots)
+        else:
+            cv_img = None
+            result = self.analyze_image_prepare(filename, strip_only=not check_distortion, data=data, decoded=decoded)
+            if not result:
+                measurements['error'] = "IMAGE_LOAD_ERROR"
+            elif not result[1]:
+                measurements['error'] = "NO_TARGETS"
+            else:
+                cv_img, steps = result
+                measurements.update(self.measure_steps(cv_img, steps, snapshots))
+        
+        if cv_img is not None and not measurements.get('error'):
+            if check_distortion:
+                is_distorted, max_ecc, found_cnt, dist_boxes = self.check_distortion(cv_img)
+                if details is not None:
+                    details['dist_boxes'] = dist_boxes
+                measurements['distortion'] = {'is_distorted': bool(is_distorted), 'max_ecc': float(max_ecc), 'shape_cnt': int(found_cnt)}
+        
+        if details is not None:
+            details['measurements'] = measurements
+            details['timing'] = stop_stage_timing()
+        return self.grade_record(self.build_record(filename, measurements), fail_thd)
+
+    def measure_steps(self, image, steps, snapshots=None):
+        """Stages 3-4 for the steps of one seam: {'shifts', 'discs', 'roi_error'}; debug ROIs go to snapshots."""
+        shifts, discs_all, roi_error = [], [], []
+        for step in steps:
+            shift, debug_roi, discs = self.process_step(image, step)
+            if snapshots is not None:
+                snapshots.append({'img': debug_roi, 'index': step['index'], 'rect': step['rect']})
+            shifts.append(shift)
+            discs_all.append([float(d) for d in discs])
+            roi_error.append(step.get('force_fail') is not None)
+        return {'shifts': shifts, 'discs': discs_all, 'roi_error': roi_error}
+
+    def measure_seam(self, image, target):
+        """Stages 2-4 for one seam: (seam measurements, debug snapshots)."""
+        seam, snapshots = {'x': int(target['x']), 'cam': self.seam_cam(target['x'])}, []
+        steps = self.seam_steps(image, target)
+        if steps is None:
+            seam['error'] = "NO_TARGETS"
+        else:
+            seam.update(self.measure_steps(image, steps, snapshots))
+        return seam, snapshots
+
+    def measure_seams(self, filename, strip_only, data, decoded, measurements, snapshots=None):
+        """
+        Multi-seam mode: one decode, then stages 2-4 for every seam the centre
+        windows find (up to four), on seam_workers threads. measurements gets
+        'seams' ([{'x', 'cam', 'shifts', 'discs', 'roi_error'} or {'x', 'cam',
+        'error'}]) and, at the top level, the first analysable seam (the one
+        single-seam mode reports). Returns the decoded image or None.
+        """
+        located = self.locate_seams(filename, strip_only, data, decoded)
+        if not located:
+            measurements['error'] = "IMAGE_LOAD_ERROR"
+            return None
+        image, targets = located
+        if not targets:
+            # No seam at all: the single-seam ROI_SELECTOR_ERROR steps
+            measurements.update(self.measure_steps(image, self.analyze_image_prepare(filename, decoded=(image, []))[1], snapshots))
+            return image
+        
+        # Stage timing is per thread: seam threads collect their own and hand it back
+        timed = getattr(_stage_timing, 'timing', None) is not None
+        def job(target):
+            if timed: start_stage_timing()
+            seam, seam_snapshots = self.measure_seam(image, target)
+            return seam, seam_snapshots, stop_stage_timing() if timed else None
+        
+        workers = min(len(targets), max(1, self.seam_workers))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(job, targets))
+        else:
+            results = [(*self.measure_seam(image, t), None) for t in targets]
+        
+        seams = []
+        for seam, seam_snapshots, timing in results:
+            add_stage_timing(timing)
+            seams.append(seam)
+            if snapshots is not None: snapshots.extend(seam_snapshots)
+        primary = next((seam for seam in seams if not seam.get('error')), None)
+        if primary is None:
+            measurements['error'] = "IMAGE_LOAD_ERROR" # Same as analyze_image_prepare without a colour zone
+        else:
+            measurements.update(shifts=primary['shifts'], discs=primary['discs'], roi_error=primary['roi_error'])
+        measurements['seams'] = seams
+        return image
+
+    def build_record(self, filename, measurements):
+        """
+        spec_issue record from raw measurements: {'shifts', 'discs' (white, red,
+        green, blue ratios per target), 'roi_error', optional 'distortion'} or {'error'}.
+        Multi-seam measurements add record['seams']: one such record per seam,
+        with the seam's camera pair as 'cam' and its column as 'seam_x'.
+        """
+        record = {'file': os.path.basename(filename), 'cam': camera_id(filename) or "cam"}
+        if measurements.get('error'):
+            record['error'] = measurements['error']
+            return record
+        
+        shifts = measurements['shifts']
+        for i, (shift, discs) in enumerate(zip(shifts, measurements['discs'])):
+            w, r, g, b = discs
+            record[f"MAX_PixelsShift_{i}"] = float(shift)
+            record[f"Brightness_discontinue_{i}"] = round(w * 100.0, 1)
+            record[f"red_discontinue_{i}"] = round(r * 100.0, 1)
+            record[f"green_discontinue_{i}"] = round(g * 100.0, 1)
+            record[f"blue_discontinue_{i}"] = round(b * 100.0, 1)
+        
+        record['shifts'] = list(shifts)
+        record['roi_error'] = list(measurements['roi_error'])
+        record['pixel_shift_avg'] = sum(shifts) / len(shifts)
+        if measurements.get('distortion'):
+            record['distortion'] = dict(measurements['distortion'])
+        if 'seams' in measurements:
+            record['seams'] = []
+            for seam in measurements['seams']:
+                seam_record = self.build_record(filename, seam)
+                seam_record.update(cam=seam['cam'], seam_x=seam['x'])
+                record['seams'].append(seam_record)
+        return record
+
+    def grade_record(self, record, fail_thd):
+        """
+        (Re)apply the PASS/FAIL rules of the GUI to an analyze_image record for a
+        given fail_thd. A multi-seam record passes only when every seam passes.
+        """
+        fail_thd = int(fail_thd)
+        record['fail_thd'] = fail_thd
+        if record.get('error'):
+            record['target_pass'] = []
+            record['result'] = "SPEC_FAIL"
+            return record
+        
+        target_pass = [not err and shift < fail_thd for shift, err in zip(record['shifts'], record['roi_error'])]
+        dist = record.get('distortion')
+        image_pass = all(target_pass) and not (dist and dist['is_distorted'])
+        for seam in record.get('seams', []):
+            image_pass = self.grade_record(seam, fail_thd)['result'] == "SPEC_PASS" and image_pass
+        record['target_pass'] = target_pass
+        record['result'] = "SPEC_PASS" if image_pass else "SPEC_FAIL"
+        return record
+
+    def record_targets(self, record):
+        """
+        [(label, shift, target_pass, roi_error)] for every target of a graded record,
+        seam by seam for multi-seam records, in the order of the details snapshots.
+        label is the target index, or "cam01:0" style for multi-seam records.
+        """
+        if not record.get('seams'):
+            return list(zip(range(len(record.get('shifts', []))), record.get('shifts', []),
+                            record.get('target_pass', []), record.get('roi_error', [])))
+        targets = []
+        for seam in record['seams']:
+            for i, (shift, ok, err) in enumerate(zip(seam.get('shifts', []), seam.get('target_pass', []), seam.get('roi_error', []))):
+                targets.append((f"{seam['cam']}:{i}", shift, ok, err))
+        return targets
+
+    @timed_stage("distortion")
     def check_distortion(self, image):
         """
         Hyper-aggressive scan for geometric distortion and stitching breaks (steps).
         Focuses on eccentricity of patterns and Y-jumps in horizontal features.
         """
+        if self.dist_workers > 1 and self.dist_engine != "components":
+            return self.check_distortion_tiled(image, self.dist_workers)
+        return self.check_distortion_full(image)
+
+    def check_distortion_full(self, image):
+        """Single-process check_distortion over the whole frame."""
         try:
             h, w = image.shape[:2]
             gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
@@ -369,50 +983,134 @@ class SplicingProcessor:
             binary = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C, 
                                           cv2.THRESH_BINARY_INV, 7, 1)
             
-            contours, _ = cv2.findContours(binary, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
-            
-            max_ecc = 1.0
-            shape_cnt = 0
-            analysed_boxes = []
-            
-            for cnt in contours:
-                area = cv2.contourArea(cnt)
-                # Catch very small artifacts that might represent a break (5 pixels)
-                if 5 < area < 1000000:
-                    x, y, cw, ch = cv2.boundingRect(cnt)
-                    shape_cnt += 1
-                    analysed_boxes.append((x, y, cw, ch))
-                    
-                    if len(cnt) >= 5:
-                        try:
-                            # 1. Eccentricity check (Ellipse fitting)
-                            if len(cnt) >= 6:
-                                _, (ma, mi), _ = cv2.fitEllipse(cnt)
-                                if mi > 0:
-                                    ecc = ma / mi
-                                    if ecc > max_ecc: max_ecc = ecc
-                            
-                            # 2. Stitching Break check (Step detection):
-                            # In a panoramic stitch, a broken line segment will have a 
-                            # bounding box with unusually high Height relative to its Width if it curves/jumps.
-                            if cw > 30: # Only look at significant horizontal features
-                                step_ratio = ch / (cw * 0.05 + 1.0) # Penalty for height in horizontal lines
-                                if step_ratio > max_ecc:
-                                    max_ecc = step_ratio
-                                    
-                            # 3. Orientation Check: 
-                            # If a long contour (line) is tilted more than it should be
-                            if cw > 30 and ch > 10:
-                                lean = ch / cw
-                                if lean > 0.5: # Suspected vertical warp or break
-                                    if lean * 2 > max_ecc: max_ecc = lean * 2
-                        except: continue
+            if self.dist_engine == "components":
+                max_ecc, shape_cnt, analysed_boxes = component_distortion_stats(binary)
+            else:
+                contours, _ = cv2.findContours(binary, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+                max_ecc, shape_cnt, analysed_boxes = contour_distortion_stats(contours)
 
             is_distorted = max_ecc > self.dist_thd
             return is_distorted, round(max_ecc, 2), shape_cnt, analysed_boxes
         except Exception:
             return False, 1.0, 0, []
 
+    def check_distortion_tiled(self, image, workers):
+        """
+        check_distortion split into horizontal bands scored on a process pool.
+        Pass 1 labels the 8-connected components of every band; components that
+        cross band borders are merged here (union-find over the border rows) to
+        get their true vertical extent. Pass 2 traces each band over a region
+        tall enough to hold every component that starts in it, and scores only
+        those, so each contour is traced whole exactly once. Bands are
+        thresholded with 3 rows of context, which reproduces the 7x7 adaptive mean.
+        Same (is_distorted, max_ecc, shape_cnt) as the full-frame scan and the same
+        set of boxes (listed band by band instead of in findContours order).
+        When the pool fails (dead worker, pickling error) it is replaced and the
+        frame is scanned in this process, so a failed scan is never reported clean.
+        """
+        try:
+            h, w = image.shape[:2]
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            pool = get_process_pool(workers)
+            
+            n_bands = max(1, min(workers * 2, h // 64))
+            edges = [int(round(h * k / n_bands)) for k in range(n_bands + 1)]
+            ctx, margin = 3, self.dist_margin # ctx = half of the adaptiveThreshold block size
+            
+            def gray_args(y0, y1):
+                gy0, gy1 = max(0, y0 - ctx), min(h, y1 + ctx)
+                return gray[gy0:gy1], gy0
+            
+            # Pass 1: component extents per band
+            futs = [pool.submit(distortion_band_extents, *gray_args(edges[k], edges[k+1]), edges[k], edges[k+1])
+                    for k in range(n_bands)]
+            extents = [f.result() for f in futs]
+            
+            # Merge components touching across each band border (8-connectivity)
+            offsets = np.cumsum([0] + [len(e[0]) for e in extents])
+            top = np.concatenate([e[0] for e in extents])
+            bottom = np.concatenate([e[1] for e in extents])
+            parent = {}
+            def find(a):
+                root = a
+                while parent.get(root, root) != root: root = parent[root]
+                while a != root:
+                    parent[a], a = root, parent[a]
+                return root
+            for k in range(n_bands - 1):
+                upper, lower = extents[k][3], extents[k+1][2]
+                for dx in (-1, 0, 1):
+                    a = upper[max(0, -dx):w - max(0, dx)]
+                    b = lower[max(0, dx):w - max(0, -dx)]
+                    hit = (a > 0) & (b > 0)
+                    pairs = np.unique(np.stack((a[hit] + offsets[k], b[hit] + offsets[k+1]), axis=1), axis=0)
+                    for na, nb in pairs.tolist():
+                        ra, rb = find(na), find(nb)
+                        if ra != rb: parent[ra] = rb
+            groups = {}
+            for node in list(parent):
+                groups.setdefault(find(node), []).append(node)
+            for root, nodes in groups.items():
+                nodes.append(root)
+                top[nodes] = top[nodes].min()
+                bottom[nodes] = bottom[nodes].max()
+            
+            # Pass 2: score each band over a region holding all components that start in it
+            futs = []
+            for k in range(n_bands):
+                own_y0, own_y1 = edges[k], edges[k+1]
+                band_top, band_bottom = top[offsets[k]+1:offsets[k+1]], bottom[offsets[k]+1:offsets[k+1]]
+                owned = (band_top >= own_y0) & (band_top < own_y1)
+                need = int(band_bottom[owned].max()) + 1 if owned.any() else own_y1
+                region_y0 = max(0, own_y0 - margin)
+                region_y1 = min(h, max(own_y1, need) + margin)
+                futs.append(pool.submit(distortion_band_job, *gray_args(region_y0, region_y1),
+                                        region_y0, region_y1, own_y0, own_y1, h))
+            results = [f.result() for f in futs]
+            
+            max_ecc = max(r[0] for r in results)
+            shape_cnt = sum(r[1] for r in results)
+            analysed_boxes = [box for r in results for box in r[2]]
+            
+            is_distorted = max_ecc > self.dist_thd
+            return is_distorted, round(max_ecc, 2), shape_cnt, analysed_boxes
+        except Exception:
+            reset_process_pool()
+            return self.check_distortion_full(image)
+
+    @timed_stage("pixel_shift")
+    def step_shift(self, gray, step_info, diff_thd=None):
+        """
+        Stage 3 on a target's gray ROI: pixel shift over the five centre lines plus
+        the alignment/calibration rules. Depends only on diff_thd and rate_thd,
+        so a parameter sweep can re-run it on a stored ROI.
+        Returns (final_ps, max_vL, max_vR).
+        """
+        if diff_thd is None: diff_thd = self.diff_thd
+        h, w = gray.shape[:2]
+        centers = [int(w/2 - w/6*2), int(w/2 - w/6), int(w/2), int(w/2 + w/6), int(w/2 + w/6*2)]
+        
+        all_vL, all_vR, line_diffs = [], [], []
+        for vL, vR, ps in self.Pixel_Shift_analysis_batch(gray, diff_thd, centers):
+            mvL, mvR = max(vL), max(vR)
+            all_vL.append(mvL)
+            all_vR.append(mvR)
+            line_diffs.append(max(abs(mvL - mvR), ps))
+            
+        final_ps = max(line_diffs)
+        max_vL, max_vR = max(all_vL), max(all_vR)
+        
+        if final_ps >= 15: final_ps = 15
+        
+        if step_info.get('alignment_offset', 0) >= 15:
+            final_ps = max(final_ps, step_info['alignment_offset'])
+
+        if step_info.get('calibration', 0) == 1:
+            final_ps = abs(final_ps - 1)
+        else:
+            final_ps = abs(final_ps)
+        return final_ps, max_vL, max_vR
+
     def process_step(self, image, step_info):
         force_fail = step_info.get('force_fail')
         if force_fail is not None:
@@ -438,29 +1136,7 @@ class SplicingProcessor:
         
         gray = cv2.cvtColor(ROI_img, cv2.COLOR_BGR2GRAY)
         h, w = gray.shape[:2]
-        
-        centers = [int(w/2 - w/6*2), int(w/2 - w/6), int(w/2), int(w/2 + w/6), int(w/2 + w/6*2)]
-        
-        all_vL, all_vR, line_diffs = [], [], []
-        for cl in centers:
-            vL, vR, ps = self.Pixel_Shift_analysis(gray, self.diff_thd, cl)
-            mvL, mvR = max(vL), max(vR)
-            all_vL.append(mvL)
-            all_vR.append(mvR)
-            line_diffs.append(max(abs(mvL - mvR), ps))
-            
-        final_ps = max(line_diffs)
-        max_vL, max_vR = max(all_vL), max(all_vR)
-        
-        if final_ps >= 15: final_ps = 15
-        
-        if step_info.get('alignment_offset', 0) >= 15:
-            final_ps = max(final_ps, step_info['alignment_offset'])
-
-        if step_info.get('calibration', 0) == 1:
-            final_ps = abs(final_ps - 1)
-        else:
-            final_ps = abs(final_ps)
+        final_ps, max_vL, max_vR = self.step_shift(gray, step_info)
         
         debug_viz = ROI_img.copy()
         if max_vL > 0:
@@ -469,3 +1145,138 @@ class SplicingProcessor:
             cv2.line(debug_viz, (int(w/2), int(max_vR)), (w, int(max_vR)), (0, 0, 255), 1)
             
         return int(final_ps), debug_viz, (white_d, red_d, green_d, blue_d)
+
+class DecodePrefetcher:
+    """
+    Reads and decodes the next files of a batch on background threads while the
+    current one is analysed. At most `depth` files are held ahead of the consumer
+    and decoded frames are capped at `mem_budget_mb` (one frame is always allowed
+    so the pipeline never stalls). get(path) returns the decode_image result,
+    decoding synchronously for paths that are not (or no longer) queued.
+    With complete=False more paths may be queued later with extend() (batch
+    still loading); the workers then wait for them instead of exiting.
+    all_seams: strip decodes keep every seam (multi-seam mode, see locate_seams).
+    """
+    def __init__(self, processor, paths, strip_only=False, depth=2, mem_budget_mb=512, threads=1, complete=True,
+                 all_seams=False):
+        self.processor = processor
+        self.paths = list(paths)
+        self.strip_only = strip_only
+        self.all_seams = all_seams
+        self.depth = max(1, int(depth))
+        self.budget = max(0, int(mem_budget_mb)) * 1024 * 1024
+        self.cond = threading.Condition()
+        self.ready = {}      # index -> (decoded, nbytes, stage timing ms)
+        self.held = 0        # bytes of ready + in-flight frames
+        self.frame_est = 0   # largest frame seen so far (reservation for in-flight decodes)
+        self.next_i = 0      # next index to decode
+        self.consumed = 0    # index the consumer will ask for next
+        self.closed = False
+        self.complete = complete
+        self.threads = [threading.Thread(target=self._worker, daemon=True) for _ in range(max(1, int(threads)))]
+        for t in self.threads: t.start()
+
+    def _can_claim(self):
+        if self.next_i >= len(self.paths): return False
+        if self.next_i - self.consumed >= self.depth: return False
+        # Always allow one frame ahead; beyond that respect the memory budget
+        return self.held == 0 or self.held + self.frame_est <= self.budget
+
+    def _worker(self):
+        while True:
+            with self.cond:
+                while not self.closed and not self._can_claim():
+                    if self.next_i >= len(self.paths) and self.complete: return
+                    self.cond.wait()
+                if self.closed: return
+                i = self.next_i
+                self.next_i += 1
+                reserved = self.frame_est
+                self.held += reserved
+            
+            start_stage_timing()
+            decoded = self.processor.decode_image(self.paths[i], self.strip_only, all_seams=self.all_seams)
+            timing = stop_stage_timing() # Handed to the consumer's timing in get()
+            nbytes = decoded[0].nbytes if decoded else 0
+            
+            with self.cond:
+                self.held += nbytes - reserved
+                self.frame_est = max(self.frame_est, nbytes)
+                if self.closed or i < self.consumed:
+                    self.held -= nbytes # Consumer moved past it (or stopped)
+                else:
+                    self.ready[i] = (decoded, nbytes, timing)
+                self.cond.notify_all()
+
+    def get(self, path):
+        with self.cond:
+            try: i = self.paths.index(path, self.consumed)
+            except ValueError: i = -1
+            if i >= 0:
+                # Drop anything the consumer skipped
+                for j in [j for j in self.ready if j < i]:
+                    self.held -= self.ready.pop(j)[1]
+                self.consumed = i
+                self.cond.notify_all()
+                while i >= self.next_i and not self.closed:
+                    self.cond.wait() # Not claimed yet (depth/budget wait) - it is next in line
+                while i not in self.ready and not self.closed:
+                    self.cond.wait()
+                item = self.ready.pop(i, None)
+                self.consumed = i + 1
+                if item:
+                    self.held -= item[1]
+                self.cond.notify_all()
+                if item:
+                    add_stage_timing(item[2])
+                    return item[0]
+        return self.processor.decode_image(path, self.strip_only, all_seams=self.all_seams)
+
+    def extend(self, paths, complete=True):
+        """Queue more paths (progressive loading); complete=True once no more will follow."""
+        with self.cond:
+            self.paths.extend(paths)
+            self.complete = complete
+            self.cond.notify_all()
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.ready.clear()
+            self.held = 0
+            self.cond.notify_all()
+
+# Per-process engine for analyze_image_job (built once per pool worker)
+_job_processor = None
+
+def analyze_image_job(filename, settings, data=None):
+    """
+    Process-pool entry point for batch analysis: analyze_image with a worker-local
+    SplicingProcessor configured from settings (diff_thd, rate_thd, dist_thd,
+    dist_engine, fail_thd, check_distortion, multi_seam, seam_prior). Returns
+    (record, details). seam_prior (True or a JSON file to start from) keeps a
+    worker-local SeamPrior whose snapshot goes to details['seam_prior'].
+    details carries no 'dist_boxes': callers only keep the verdict, and the
+    tens of thousands of boxes per frame are not worth pickling back.
+    """
+    global _job_processor
+    if _job_processor is None:
+        _job_processor = SplicingProcessor()
+    processor = _job_processor
+    for key in ('diff_thd', 'rate_thd', 'dist_thd', 'dist_engine'):
+        if key in settings: setattr(processor, key, settings[key])
+    processor.dist_workers = 1 # Already inside a pool worker
+    processor.seam_workers = 1
+    prior = settings.get('seam_prior')
+    if not prior:
+        processor.seam_prior = None
+    elif processor.seam_prior is None:
+        processor.seam_prior = SeamPrior(prior if isinstance(prior, str) else None)
+    
+    details = {}
+    record = processor.analyze_image(filename, settings.get('fail_thd', 4), settings.get('check_distortion', False),
+                                     data=data, details=details, multi_seam=settings.get('multi_seam', False))
+    details.pop('dist_boxes', None)
+    if processor.seam_prior is not None:
+        details['seam_prior'] = dict(processor.seam_prior.snapshot(), pid=os.getpid())
+    return record, details
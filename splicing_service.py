@@ -0,0 +1,248 @@
+"""
+Long-lived local analysis service for ATS integration.
+
+    python -m splicing_service --port 8765 --workers 2
+
+Keeps warm SplicingProcessor workers so a call costs the analysis only, not the
+Python + OpenCV + SciPy start-up of running the 100cm script per image.
+Listens on loopback HTTP:
+
+    GET  /analyze?path=D:/lot/4cam_cam12_x.jpg           legacy text (default)
+    GET  /analyze?path=...&format=json                   spec_issue record as JSON
+    POST /analyze?name=4cam_cam12_x.jpg  <image bytes>   analyse uploaded bytes
+    POST /analyze  {"path": "...", "fail": 4, "format": "json"}
+    GET  /health
+
+Defaults are the 100cm script's diff_thd=10 / Rate < 0.1 (not the GUI's 18 /
+0.18), so the legacy text returns the numbers ATS got from the script;
+service_parity.py checks this on IMAGE/. Per-call overrides: fail, diff, rate,
+dist (0/1), dist_thd, seams (0/1, multi-seam mode); a non-numeric, negative or
+non-finite threshold is answered with 400 naming the field. With --seam-prior FILE the workers locate seams from the
+per-camera location prior; /health then reports its hit rate. The legacy text repeats the script's MAX_PixelsShift_i=...
+pixelsMAX_PixelsShift_i_END and *_discontinue_i=...%..._END lines so existing
+ATS parsers keep working; in multi-seam mode there is one such block per seam,
+headed by SEAM_camXY:.
+"""
+import argparse
+import json
+import math
+import os
+import signal
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from splicing_logic import SplicingProcessor, ENGINE_VERSION, analyze_image_job, get_process_pool
+from splicing_cli import add_analysis_args, make_settings
+from result_cache import ResultCache, content_digest
+from seam_prior import SeamPrior
+
+def format_legacy(record):
+    """spec_issue record -> the 100cm script's stdout lines parsed by ATS."""
+    if record.get('seams'):
+        return "".join(f"SEAM_{seam['cam']}:\n" + format_legacy(seam) for seam in record['seams'])
+    lines = [record['file']]
+    if record.get('error'):
+        # The script reports an image without targets as ROI_SELECTOR_ERROR with 100% everywhere
+        lines.insert(0, "ROI_SELECTOR_ERROR:")
+        for i in range(3):
+            lines.append(f"MAX_PixelsShift_{i}=100.0pixelsMAX_PixelsShift_{i}_END")
+            for key in ("Brightness", "red", "green", "blue"):
+                lines.append(f"{key}_discontinue_{i}=100.0%{key}_discontinue_{i}_END")
+        return "\n".join(lines) + "\n"
+
+    n = len(record['shifts'])
+    for i in range(n):
+        if record['roi_error'][i]:
+            lines.append(f"MAX_PixelsShift_{i}=100.0pixelsMAX_PixelsShift_{i}_END")
+        else:
+            lines.append(f"MAX_PixelsShift_{i}={record['shifts'][i]} pixelsMAX_PixelsShift_{i}_END")
+    for i in range(n):
+        for key in ("Brightness", "red", "green", "blue"):
+            lines.append(f"{key}_discontinue_{i}={record[f'{key}_discontinue_{i}']}%{key}_discontinue_{i}_END")
+    return "\n".join(lines) + "\n"
+
+def _param(params, key, integer=False):
+    """params[key] as a finite number >= 0 (an int when integer); ValueError naming the field otherwise."""
+    raw = params[key]
+    try:
+        value = float(raw)
+    except (TypeError, ValueError):
+        value = None
+    if isinstance(raw, bool) or value is None or not math.isfinite(value) or value < 0 \
+            or (integer and not value.is_integer()):
+        kind = "a non-negative integer" if integer else "a finite number >= 0"
+        raise ValueError(f"bad parameter {key}={raw!r}: must be {kind}")
+    return int(value) if integer else value
+
+def _warm_up():
+    """Pool worker start-up: importing splicing_logic (cv2, numpy) happens here, not on the first call."""
+    return os.getpid()
+
+class AnalysisService:
+    """Runs analyze_image_job on warm workers (a process pool, or in-process when workers == 1)."""
+    def __init__(self, settings, workers=1, cache=None):
+        self.settings = settings
+        self.workers = max(1, int(workers))
+        self.cache = cache
+        self.processor = SplicingProcessor() # build_record / grade_record for cache hits
+        self.lock = threading.Lock()
+        self.served = 0
+        # Collects the workers' seam prior snapshots (hit rate, entries saved on close)
+        self.seam_prior = SeamPrior(settings['seam_prior']) if settings.get('seam_prior') else None
+        if self.workers > 1:
+            # Start the pool processes now (in-process mode is already warm: the imports are done)
+            pool = get_process_pool(self.workers)
+            for f in [pool.submit(_warm_up) for _ in range(self.workers)]: f.result()
+
+    def call_settings(self, params):
+        """Server settings with the per-call overrides of params (query string or JSON body); ValueError on a bad value."""
+        settings = dict(self.settings)
+        if 'fail' in params: settings['fail_thd'] = _param(params, 'fail', integer=True)
+        if 'diff' in params: settings['diff_thd'] = int(_param(params, 'diff'))
+        if 'rate' in params: settings['rate_thd'] = _param(params, 'rate')
+        if 'dist_thd' in params: settings['dist_thd'] = _param(params, 'dist_thd')
+        if 'dist' in params: settings['check_distortion'] = str(params['dist']).lower() in ("1", "true", "yes")
+        if 'seams' in params: settings['multi_seam'] = str(params['seams']).lower() in ("1", "true", "yes")
+        return settings
+
+    def analyze(self, path, data=None, settings=None):
+        """spec_issue record for an image path, or for encoded bytes (path then only names the image)."""
+        settings = settings or self.settings
+        digest = content_digest(path, data) if self.cache else None
+        hit = self.cache.get(digest, settings) if self.cache else None
+        if hit:
+            record = self.processor.grade_record(self.processor.build_record(path, hit[0]), settings['fail_thd'])
+            record['cached'] = True
+        elif self.workers > 1:
+            record, details = get_process_pool(self.workers).submit(analyze_image_job, path, settings, data).result()
+        else:
+            with self.lock:
+                record, details = analyze_image_job(path, settings, data)
+        if self.cache and not hit:
+            self.cache.put(digest, settings, details['measurements'], details.get('snapshots', []))
+        if self.seam_prior is not None and not hit and details.get('seam_prior'):
+            self.seam_prior.merge(details['seam_prior'], details['seam_prior']['pid'])
+        with self.lock:
+            self.served += 1
+        return record
+
+    def close(self):
+        if self.workers > 1:
+            pool = get_process_pool(self.workers)
+            if sys.version_info >= (3, 9): pool.shutdown(wait=False, cancel_futures=True)
+            else: pool.shutdown(wait=False) # cancel_futures is 3.9+; queued jobs still run on 3.8
+        if self.cache: self.cache.close()
+        if self.seam_prior is not None: self.seam_prior.save()
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    service = None # AnalysisService, set by serve()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if url.path == "/health":
+            health = {'status': "ok", 'engine': ENGINE_VERSION, 'workers': self.service.workers, 'served': self.service.served}
+            if self.service.seam_prior is not None:
+                health['seam_prior'] = self.service.seam_prior.stats()
+            return self.send_json(200, health)
+        if url.path == "/analyze":
+            return self.handle_analyze(params, None)
+        self.send_json(404, {'error': f"unknown endpoint {url.path}"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/analyze":
+            return self.send_json(404, {'error': f"unknown endpoint {url.path}"})
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0) or 0))
+        if self.headers.get('Content-Type', "").startswith("application/json"):
+            try:
+                params.update(json.loads(body or b"{}"))
+            except ValueError as e:
+                return self.send_json(400, {'error': f"bad JSON body: {e}"})
+            body = None
+        self.handle_analyze(params, body or None)
+
+    def handle_analyze(self, params, data):
+        path = params.get('path') if data is None else params.get('name', params.get('path', "upload.jpg"))
+        if not path:
+            return self.send_json(400, {'error': "path (or a POSTed image body) is required"})
+        if data is None and not os.path.isfile(path):
+            return self.send_json(404, {'error': f"file not found: {path}"})
+        try:
+            settings = self.service.call_settings(params)
+        except ValueError as e:
+            return self.send_json(400, {'error': str(e)})
+        try:
+            t0 = time.perf_counter()
+            record = self.service.analyze(path, data, settings)
+            elapsed = round(time.perf_counter() - t0, 3)
+        except Exception as e:
+            return self.send_json(500, {'error': str(e)})
+
+        record['elapsed_s'] = elapsed
+        if params.get('format', "legacy") == "json":
+            self.send_json(200, record, elapsed)
+        else:
+            self.send_text(200, format_legacy(record), elapsed)
+
+    def send_json(self, code, obj, elapsed=None):
+        self.send_body(code, json.dumps(obj, ensure_ascii=False).encode('utf-8'), "application/json; charset=utf-8", elapsed)
+
+    def send_text(self, code, text, elapsed=None):
+        self.send_body(code, text.encode('utf-8'), "text/plain; charset=utf-8", elapsed)
+
+    def send_body(self, code, body, content_type, elapsed=None):
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if elapsed is not None:
+            self.send_header("X-Analysis-Time", f"{elapsed:.3f}")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            sys.stderr.write(f"[{time.strftime('%H:%M:%S')}] {format % args}\n")
+
+def serve(service, host="127.0.0.1", port=8765, quiet=False):
+    ServiceHandler.service = service
+    server = ThreadingHTTPServer((host, port), ServiceHandler)
+    server.quiet = quiet
+    return server
+
+# The 100cm script's hard-coded parameters: the service is a drop-in for it
+SCRIPT_DIFF_THD, SCRIPT_RATE_THD = 10, 0.1
+
+def make_parser():
+    ap = argparse.ArgumentParser(prog="python -m splicing_service", description="Local 4CAM splicing analysis service (loopback HTTP).")
+    add_analysis_args(ap, diff=SCRIPT_DIFF_THD, rate=SCRIPT_RATE_THD)
+    ap.add_argument("--host", default="127.0.0.1", help="bind address (default loopback only)")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--workers", type=int, default=1, help="warm analysis processes (1 = in-process)")
+    ap.add_argument("--cache", help="SQLite result cache file")
+    ap.add_argument("--quiet", action="store_true", help="no per-request log lines")
+    return ap
+
+def main(argv=None):
+    args = make_parser().parse_args(argv)
+
+    cache = ResultCache(args.cache) if args.cache else None
+    service = AnalysisService(make_settings(args), args.workers, cache)
+    server = serve(service, args.host, args.port, args.quiet)
+    print(f"splicing service {ENGINE_VERSION} on http://{args.host}:{args.port} ({service.workers} worker(s))", file=sys.stderr)
+    # Stopped by the ATS host with SIGTERM: shut the pool down instead of orphaning its workers
+    signal.signal(signal.SIGTERM, lambda *a: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())